@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""Benchmark the cost of creating pyrise objects, both directly and
+from XML. Run it from the root of the repository:
+
+    $ python benchmarks/construction.py
+"""
+
+import gc
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from pyrise import *
+
+PERSON_XML = ElementTree.fromstring('''<person>
+  <id type="integer">1</id>
+  <first-name>Inkbert</first-name>
+  <last-name>McSquibbles</last-name>
+  <title>Chief Sea Squid</title>
+  <company-id type="integer">2</company-id>
+  <visible-to>Everyone</visible-to>
+  <created-at type="datetime">2011-09-01T10:00:00Z</created-at>
+  <updated-at type="datetime">2011-09-02T10:00:00Z</updated-at>
+  <contact-data>
+    <email-addresses type="array">
+      <email-address><id type="integer">3</id><address>inkbert@example.com</address><location>Work</location></email-address>
+    </email-addresses>
+    <phone-numbers type="array">
+      <phone-number><id type="integer">4</id><number>512-555-1234</number><location>Work</location></phone-number>
+    </phone-numbers>
+  </contact-data>
+</person>''')
+
+
+def count_allocations(func, number=1000):
+    """Count how many more objects the garbage collector is tracking
+    after calling func number times (and keeping the results)"""
+
+    gc.collect()
+    before = len(gc.get_objects())
+    results = [func() for i in xrange(number)]
+    after = len(gc.get_objects())
+    return (after - before) / float(number)
+
+
+def object_size(obj):
+    """Add up the memory used by an object, its dictionary (if it has
+    one), and any nested objects and lists, but not the values in them
+    (which are usually shared or the same size either way)"""
+
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+    for field in getattr(obj, 'fields', ()):
+        value = getattr(obj, field, None)
+        if isinstance(value, list):
+            size += sys.getsizeof(value) + sum(object_size(item) for item in value)
+        elif isinstance(value, HighriseObject):
+            size += object_size(value)
+    return size
+
+
+def lazy_from_xml():
+    Highrise.set_lazy_nested(True)
+    try:
+        return Person.from_xml(PERSON_XML)
+    finally:
+        Highrise.set_lazy_nested(False)
+
+
+def main():
+    cases = [
+        ('Person()', lambda: Person()),
+        ('Person(first_name=...)', lambda: Person(first_name='Inkbert', last_name='McSquibbles')),
+        ('Note()', lambda: Note()),
+        ('Person.from_xml()', lambda: Person.from_xml(PERSON_XML)),
+        ('compact Person.from_xml()', lambda: Person.compact().from_xml(PERSON_XML)),
+        ('lazy Person.from_xml()', lazy_from_xml),
+    ]
+
+    print '%-26s %12s %14s %14s' % ('', 'usec/object', 'objects/call', 'bytes/object')
+    for name, func in cases:
+        usec = min(timeit.repeat(func, number=10000, repeat=3)) / 10000 * 1e6
+        print '%-26s %12.2f %14.1f %14d' % (name, usec, count_allocations(func), object_size(func()))
+
+
+if __name__ == '__main__':
+    main()
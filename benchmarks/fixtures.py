@@ -0,0 +1,163 @@
+"""Generate realistic Highrise XML for the benchmarks: people with plenty
+of contact data, and deals with the parties involved in them. The output
+is the same every time, so results can be compared from run to run.
+
+Run it directly to write the fixtures to a directory, e.g. to look at them
+or to use as a starting point for recorded ones:
+
+    $ python benchmarks/fixtures.py benchmarks/fixtures
+"""
+
+import os
+import random
+import sys
+from xml.sax.saxutils import escape
+
+FIRST_NAMES = ('Inkbert', 'Joe', 'Marge', 'Dale', 'Prudence', 'Wendell', 'Ophelia', 'Rutger', 'Zoe', 'Amos')
+LAST_NAMES = ('McSquibbles', 'Schmoe', 'Underdog', 'Okafor', 'Lindqvist', 'Nakamura', 'Pereira', 'Smith & Sons')
+TITLES = ('Chief Sea Squid', 'Manager', 'VP of Sales', 'Account Executive', 'Founder', '')
+CITIES = (('Austin', 'TX'), ('Chicago', 'IL'), ('Portland', 'OR'), ('Boston', 'MA'))
+
+
+def _timestamp(rng):
+    return '2011-%02d-%02dT%02d:%02d:%02dZ' % (rng.randint(1, 12), rng.randint(1, 28), rng.randint(0, 23),
+                                                rng.randint(0, 59), rng.randint(0, 59))
+
+
+def _contact_data(rng, id, emails=3, phones=3, addresses=2, web=2):
+    """The contact data for one party, with a few of each kind of detail"""
+
+    parts = ['<contact-data>', '<email-addresses type="array">']
+    for i in range(emails):
+        parts.append('<email-address><id type="integer">%d</id><address>person%d.%d@example.com</address>'
+                     '<location>%s</location></email-address>' % (id * 100 + i, id, i, ('Work', 'Home', 'Other')[i % 3]))
+    parts.append('</email-addresses><phone-numbers type="array">')
+    for i in range(phones):
+        parts.append('<phone-number><id type="integer">%d</id><number>512-555-%04d</number>'
+                     '<location>%s</location></phone-number>' % (id * 100 + 10 + i, rng.randint(0, 9999),
+                                                                  ('Work', 'Mobile', 'Fax')[i % 3]))
+    parts.append('</phone-numbers><addresses type="array">')
+    for i in range(addresses):
+        city, state = rng.choice(CITIES)
+        parts.append('<address><id type="integer">%d</id><street>%d Main St.\nSuite %d</street><city>%s</city>'
+                     '<state>%s</state><zip>%05d</zip><country>United States</country><location>%s</location>'
+                     '</address>' % (id * 100 + 20 + i, rng.randint(1, 9999), rng.randint(1, 500), city, state,
+                                     rng.randint(10000, 99999), ('Work', 'Home')[i % 2]))
+    parts.append('</addresses><web-addresses type="array">')
+    for i in range(web):
+        parts.append('<web-address><id type="integer">%d</id><url>http://example.com/%d/%d</url>'
+                     '<location>Work</location></web-address>' % (id * 100 + 30 + i, id, i))
+    parts.append('</web-addresses><instant-messengers type="array"><instant-messenger><id type="integer">%d</id>'
+                 '<address>person%d</address><protocol>Jabber</protocol><location>Work</location></instant-messenger>'
+                 '</instant-messengers><twitter-accounts type="array"><twitter-account><id type="integer">%d</id>'
+                 '<username>person%d</username><location>Personal</location></twitter-account></twitter-accounts>'
+                 % (id * 100 + 40, id, id * 100 + 50, id))
+    parts.append('</contact-data>')
+    return ''.join(parts)
+
+
+def _person(rng, id, tag='person'):
+    """One person, optionally under a different tag (e.g. party)"""
+
+    return ''.join([
+        '<%s>' % tag,
+        '<id type="integer">%d</id>' % id,
+        '<first-name>%s</first-name>' % rng.choice(FIRST_NAMES),
+        '<last-name>%s</last-name>' % escape(rng.choice(LAST_NAMES)),
+        '<title>%s</title>' % rng.choice(TITLES),
+        '<background>Met at the %d conference. Likes squid &amp; chips.</background>' % rng.randint(2000, 2011),
+        '<company-id type="integer">%d</company-id>' % rng.randint(1, 1000),
+        '<company-name>Company %d</company-name>' % rng.randint(1, 1000),
+        '<visible-to>Everyone</visible-to>',
+        '<owner-id type="integer">%d</owner-id>' % rng.randint(1, 20),
+        '<group-id type="integer">0</group-id>',
+        '<author-id type="integer">%d</author-id>' % rng.randint(1, 20),
+        '<created-at type="datetime">%s</created-at>' % _timestamp(rng),
+        '<updated-at type="datetime">%s</updated-at>' % _timestamp(rng),
+        '<type>Person</type>' if tag == 'party' else '',
+        _contact_data(rng, id),
+        '</%s>' % tag,
+    ])
+
+
+def _deal(rng, id, parties=3):
+    """One deal, with its main party and a few more involved in it"""
+
+    return ''.join([
+        '<deal>',
+        '<id type="integer">%d</id>' % id,
+        '<account-id type="integer">1</account-id>',
+        '<author-id type="integer">%d</author-id>' % rng.randint(1, 20),
+        '<background>Renewal for %d seats</background>' % rng.randint(1, 500),
+        '<category-id type="integer">%d</category-id>' % rng.randint(1, 10),
+        '<visible-to>Everyone</visible-to>',
+        '<owner-id type="integer">%d</owner-id>' % rng.randint(1, 20),
+        '<group-id type="integer">0</group-id>',
+        '<created-at type="datetime">%s</created-at>' % _timestamp(rng),
+        '<updated-at type="datetime">%s</updated-at>' % _timestamp(rng),
+        '<currency>USD</currency>',
+        '<duration type="integer">%d</duration>' % rng.randint(1, 24),
+        '<name>Deal %d</name>' % id,
+        '<price type="integer">%d</price>' % rng.randint(100, 100000),
+        '<price-type>%s</price-type>' % rng.choice(('fixed', 'hour', 'month', 'year')),
+        '<responsible-party-id type="integer">%d</responsible-party-id>' % rng.randint(1, 20),
+        '<status>%s</status>' % rng.choice(('pending', 'won', 'lost')),
+        '<party-id type="integer">%d</party-id>' % (id * 10),
+        _person(rng, id * 10, 'party'),
+        '<parties type="array">',
+        ''.join(_person(rng, id * 10 + i, 'party') for i in range(1, parties + 1)),
+        '</parties>',
+        '</deal>',
+    ])
+
+
+def people_xml(count, seed=0):
+    """The XML for a list of count people"""
+
+    rng = random.Random(seed)
+    return '<?xml version="1.0" encoding="UTF-8"?>\n<people type="array">%s</people>' % (
+        ''.join(_person(rng, id) for id in range(1, count + 1)))
+
+
+def deals_xml(count, seed=0):
+    """The XML for a list of count deals"""
+
+    rng = random.Random(seed)
+    return '<?xml version="1.0" encoding="UTF-8"?>\n<deals type="array">%s</deals>' % (
+        ''.join(_deal(rng, id) for id in range(1, count + 1)))
+
+
+# the kinds of fixtures, with the tag for each record and its generator
+KINDS = {
+    'people': ('person', people_xml),
+    'deals': ('deal', deals_xml),
+}
+
+
+def load(kind, count, directory=None):
+    """Get the XML for count records of a kind ('people' or 'deals'),
+    reading it from directory (as e.g. people-100.xml) if it's there, or
+    generating it otherwise"""
+
+    if directory:
+        path = os.path.join(directory, '%s-%d.xml' % (kind, count))
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                return f.read()
+    return KINDS[kind][1](count)
+
+
+def main():
+    directory = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), 'fixtures')
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    for kind, (tag, generate) in sorted(KINDS.items()):
+        for count in (1, 100, 10000):
+            path = os.path.join(directory, '%s-%d.xml' % (kind, count))
+            with open(path, 'wb') as f:
+                f.write(generate(count))
+            print path
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+"""Load test pyrise against a local fake Highrise (see pyrise.fakeserver)
+at several levels of concurrency, and report the throughput and tail
+latency at each one. Run it from the root of the repository:
+
+    $ python benchmarks/load.py
+    $ python benchmarks/load.py --latency 0.1 --throttle-rate 0.02 --concurrency 1,8,32
+
+The fake server runs in a process of its own. Each level runs the same mix
+of operations (getting people, listing all of them, and saving changes)
+from that many threads, with the connection pool sized to match. Latencies are measured per operation, so
+they include any retries; the retries and errors behind them are counted
+separately, from the request metrics.
+"""
+
+import optparse
+import os
+import random
+import signal
+import sys
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from pyrise import *
+from pyrise.fakeserver import FakeHighrise
+
+CONCURRENCY = (1, 2, 4, 8, 16, 32)
+
+
+def start_server(options):
+    """Start the fake Highrise in a process of its own, so serving requests
+    doesn't compete with the client for the interpreter lock, and return
+    its URL and process ID"""
+
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read)
+        try:
+            server = FakeHighrise(latency=options.latency, throttle_rate=options.throttle_rate,
+                                  error_rate=options.error_rate, retry_after=0, seed=options.seed)
+            server.populate(people=options.people)
+            server.start()
+            os.write(write, server.url)
+            os.close(write)
+            while True:
+                time.sleep(3600)
+        finally:
+            os._exit(1)
+
+    os.close(write)
+    url = os.read(read, 1024)
+    os.close(read)
+    if not url:
+        raise RuntimeError, 'the fake Highrise server could not be started'
+    return url, pid
+
+
+def operations(ids):
+    """The operations that can be mixed together, each taking a random
+    number generator"""
+
+    def get(rng):
+        Person.get(rng.choice(ids))
+
+    def list_page(rng):
+        for person in Person.iter_all():
+            pass
+
+    def save(rng):
+        person = Person.get(rng.choice(ids))
+        person.background = 'Saved at %f' % time.time()
+        person.save()
+
+    return {'get': get, 'list': list_page, 'save': save}
+
+
+def percentile(values, fraction):
+    """The value a fraction (e.g. 0.99) of the sorted values fall under"""
+
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_level(concurrency, count, mix, seed):
+    """Run count operations from concurrency threads, returning the wall
+    time, the sorted latencies, and the request metrics"""
+
+    Highrise.set_pool_size(concurrency)
+    metrics = RequestMetrics()
+    Highrise.set_metrics(metrics)
+
+    # every thread gets its own random numbers, so a level always runs the
+    # same operations
+    local = threading.local()
+    def call(index):
+        if not hasattr(local, 'rng'):
+            local.rng = random.Random('%s-%s' % (seed, threading.current_thread().name))
+        operation = mix[index % len(mix)]
+        started = time.time()
+        try:
+            operation(local.rng)
+        except Exception:
+            return None
+        return time.time() - started
+
+    pool = ThreadPool(concurrency)
+    started = time.time()
+    try:
+        results = pool.map(call, range(count), chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+    elapsed = time.time() - started
+    Highrise.set_metrics(None)
+
+    latencies = sorted(result for result in results if result is not None)
+    return elapsed, latencies, count - len(latencies), metrics.stats()
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options]')
+    parser.add_option('--concurrency', default=','.join(str(level) for level in CONCURRENCY),
+                      help='the numbers of threads to try [%default]')
+    parser.add_option('--operations', type='int', default=200, help='how many operations to run at each level [%default]')
+    parser.add_option('--mix', default='get,get,get,save,list',
+                      help='the operations to cycle through (get, list, save) [%default]')
+    parser.add_option('--people', type='int', default=1000, help='how many people the fake account has [%default]')
+    parser.add_option('--latency', type='float', default=0.02, help='seconds the server holds each response back [%default]')
+    parser.add_option('--throttle-rate', type='float', default=0,
+                      help='the fraction of requests the server answers with 503 [%default]')
+    parser.add_option('--error-rate', type='float', default=0,
+                      help='the fraction of requests the server answers with 500 [%default]')
+    parser.add_option('--read-ahead', type='int', default=0,
+                      help='how many pages of a list to request ahead (see Highrise.set_read_ahead) [%default]')
+    parser.add_option('--parse-processes', type='int', default=0,
+                      help='how many processes to build the objects on pages read ahead in [%default]')
+    parser.add_option('--seed', type='int', default=0, help='the seed for the random numbers [%default]')
+    options, args = parser.parse_args()
+
+    url, pid = start_server(options)
+    Highrise.set_server(url)
+    Highrise.auth('load-test')
+    Highrise.set_retries(3, backoff=0.05, max_backoff=1)
+    Highrise.set_read_ahead(options.read_ahead)
+    Highrise.set_parse_processes(options.parse_processes)
+
+    try:
+        available = operations(sorted(int(person.id) for person in Person.iter_all()))
+        mix = [available[name] for name in options.mix.split(',')]
+        print '%11s %8s %10s %8s %8s %8s %8s %8s %7s' % ('concurrency', 'ops', 'ops/sec', 'p50 ms', 'p95 ms',
+                                                          'p99 ms', 'max ms', 'requests', 'retries')
+        for concurrency in [int(level) for level in options.concurrency.split(',')]:
+            elapsed, latencies, failed, stats = run_level(concurrency, options.operations, mix, options.seed)
+            if not latencies:
+                print '%11d  every operation failed' % concurrency
+                continue
+            requests = sum(entry['count'] for entry in stats['requests'].itervalues())
+            retries = sum(entry['retries'] for entry in stats['requests'].itervalues())
+            line = '%11d %8d %10.1f %8.1f %8.1f %8.1f %8.1f %8d %7d' % (
+                concurrency, len(latencies), len(latencies) / elapsed, percentile(latencies, 0.5) * 1000,
+                percentile(latencies, 0.95) * 1000, percentile(latencies, 0.99) * 1000, latencies[-1] * 1000,
+                requests, retries)
+            if failed:
+                line += '  (%d failed)' % failed
+            print line
+    finally:
+        os.kill(pid, signal.SIGTERM)
+        os.waitpid(pid, 0)
+
+
+if __name__ == '__main__':
+    main()
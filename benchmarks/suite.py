@@ -0,0 +1,288 @@
+#!/usr/bin/env python
+"""Benchmark parsing, object construction, and serialization with
+realistic Highrise XML (see fixtures.py), and compare the results with a
+saved baseline. Run it from the root of the repository:
+
+    $ python benchmarks/suite.py --save     # record a baseline
+    $ python benchmarks/suite.py            # compare against it
+
+Each case runs in its own forked process, so its peak memory can be
+measured without the other cases getting in the way. For every case the
+suite reports records per second (the best of a few runs), the objects
+left alive per record, and the peak memory used. If any of them is more
+than --tolerance worse than the baseline, the regressions are listed and
+the suite exits with status 1.
+
+Everything runs offline; no requests are sent to Highrise. Linux is
+needed for the memory measurements (peak memory is reported as n/a when
+the kernel can't reset it between cases).
+"""
+
+import gc
+import json
+import optparse
+import os
+import resource
+import sys
+import time
+from cStringIO import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from pyrise import *
+
+import fixtures
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+SIZES = (1, 100, 10000)
+
+# how many runs to time for each case, and roughly how long each run
+# should take (small cases are repeated to fill the time)
+RUNS = 3
+SECONDS_PER_RUN = 0.25
+
+
+def parse(content, tag):
+    """Just parse the XML, throwing each record away"""
+
+    return [None for element in Highrise.iterparse(content, tag)]
+
+
+def construct(klass, tag):
+    """Build objects from XML that has already been parsed"""
+
+    def setup(content):
+        return list(ElementTree.fromstring(content).getiterator(tag))
+
+    def run(elements):
+        return [klass.from_xml(element) for element in elements]
+
+    return setup, run
+
+
+def serialize(objs):
+    """Turn objects back into complete XML strings with to_xml"""
+
+    return [ElementTree.tostring(obj.to_xml()) for obj in objs]
+
+
+def write(objs):
+    """Write the request bodies for saving objects, the way save() does"""
+
+    bodies = []
+    for obj in objs:
+        body = StringIO()
+        obj.write_xml(body)
+        bodies.append(body.getvalue())
+    return bodies
+
+
+def cases():
+    """Return each case as (name, kind, setup, run). setup takes the
+    fixture XML and returns whatever run needs; only run is measured, and
+    it should return the records it produced."""
+
+    unchanged = lambda content: content
+
+    for kind, klass in (('people', Person), ('deals', Deal)):
+        tag = fixtures.KINDS[kind][0]
+        build_setup, build = construct(klass, tag)
+        load = lambda content, klass=klass, tag=tag: [klass.from_xml(e) for e in Highrise.iterparse(content, tag)]
+        yield ('%s parse' % kind, kind, unchanged, lambda content, tag=tag: parse(content, tag))
+        yield ('%s from_xml' % kind, kind, build_setup, build)
+        yield ('%s list' % kind, kind, unchanged, load)
+        yield ('%s to_xml' % kind, kind, load, serialize)
+        yield ('%s write_xml' % kind, kind, load, write)
+
+    # converting between XML tags and class names, for every tag in the
+    # people fixture
+    yield ('keys', 'people', lambda content: [element.tag for element in ElementTree.fromstring(content).getiterator()],
+           lambda tags: [Highrise.class_to_key(Highrise.key_to_class(tag)) for tag in tags])
+
+
+def rss_kb():
+    """Get the resident memory of this process, in kilobytes"""
+
+    with open('/proc/self/statm') as f:
+        pages = int(f.read().split()[1])
+    return pages * resource.getpagesize() // 1024
+
+
+def reset_peak_rss():
+    """Reset the peak resident memory of this process to what it's using
+    now, returning False if the kernel doesn't support it"""
+
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except IOError:
+        return False
+    return True
+
+
+def peak_rss_kb():
+    """Get the peak resident memory of this process since it started (or
+    since reset_peak_rss), in kilobytes"""
+
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1])
+    return None
+
+
+def measure(setup, run, content):
+    """Time a case, count the objects it leaves alive, and measure its
+    peak memory (this should be called in a process of its own)"""
+
+    prepared = setup(content)
+
+    # objects left alive per record, and peak memory above where we started
+    # (the peak is reset first, so whatever setup used isn't counted; if
+    # it can't be, the peak is left out rather than reported wrongly)
+    gc.collect()
+    before_objects = len(gc.get_objects())
+    before_rss = rss_kb()
+    can_measure = reset_peak_rss()
+    started = time.time()
+    records = run(prepared)
+    first = time.time() - started
+    peak_kb = None
+    if can_measure:
+        peak = peak_rss_kb()
+        if peak is not None:
+            peak_kb = max(0, peak - before_rss)
+    gc.collect()
+    count = len(records)
+    objects = (len(gc.get_objects()) - before_objects) / float(count or 1)
+    del records
+
+    # then the best time from a few runs, unless a single run already
+    # takes long enough to give a steady number
+    repeat = max(1, int(SECONDS_PER_RUN / max(first, 1e-6)))
+    best = first
+    for i in range(RUNS - 1 if first < SECONDS_PER_RUN * 4 else 0):
+        started = time.time()
+        for j in xrange(repeat):
+            run(prepared)
+        elapsed = (time.time() - started) / repeat
+        best = min(best, elapsed)
+
+    return {
+        'records': count,
+        'records_per_sec': count / best if best else None,
+        'objects_per_record': objects,
+        'peak_kb': peak_kb,
+    }
+
+
+def measure_in_child(setup, run, content):
+    """Run measure in a forked process and return what it found"""
+
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read)
+        try:
+            result = json.dumps(measure(setup, run, content))
+        except Exception, e:
+            result = json.dumps({'error': '%s: %s' % (e.__class__.__name__, e)})
+        os.write(write, result)
+        os.close(write)
+        os._exit(0)
+
+    os.close(write)
+    chunks = []
+    while True:
+        chunk = os.read(read, 65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    os.close(read)
+    os.waitpid(pid, 0)
+    return json.loads(''.join(chunks))
+
+
+def compare(result, baseline, tolerance):
+    """List the ways a result is worse than the baseline by more than
+    tolerance (a fraction, e.g. 0.2 for 20%)"""
+
+    problems = []
+    if baseline.get('records_per_sec') and result['records_per_sec'] < baseline['records_per_sec'] * (1 - tolerance):
+        problems.append('%.0f records/sec, down from %.0f' % (result['records_per_sec'], baseline['records_per_sec']))
+    if result['objects_per_record'] > baseline['objects_per_record'] * (1 + tolerance) + 0.5:
+        problems.append('%.1f objects/record, up from %.1f' % (result['objects_per_record'], baseline['objects_per_record']))
+
+    # small amounts of memory are mostly noise, so allow an extra megabyte
+    # (and skip the check when either peak couldn't be measured)
+    peak_kb, baseline_kb = result.get('peak_kb'), baseline.get('peak_kb')
+    if peak_kb is not None and baseline_kb is not None and peak_kb > baseline_kb * (1 + tolerance) + 1024:
+        problems.append('%d KB peak memory, up from %d' % (peak_kb, baseline_kb))
+    return problems
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options]')
+    parser.add_option('--save', action='store_true', help='save the results as the new baseline')
+    parser.add_option('--baseline', default=BASELINE, help='the baseline file [%default]')
+    parser.add_option('--tolerance', type='float', default=0.2,
+                      help='how much worse than the baseline a result can be [%default]')
+    parser.add_option('--sizes', default=','.join(str(size) for size in SIZES),
+                      help='the numbers of records to benchmark with [%default]')
+    parser.add_option('--fixtures', help='a directory of recorded fixtures to use (e.g. people-100.xml) '
+                                         'instead of generated ones')
+    parser.add_option('--filter', default='', help='only run the cases with this in their name')
+    options, args = parser.parse_args()
+
+    baseline = {}
+    if not options.save and os.path.exists(options.baseline):
+        with open(options.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    print '%-28s %8s %14s %12s %10s  %s' % ('case', 'records', 'records/sec', 'objs/record', 'peak KB', 'vs. baseline')
+    for size in [int(size) for size in options.sizes.split(',')]:
+        content = {}
+        for name, kind, setup, run in cases():
+            name = '%s (%d)' % (name, size)
+            if options.filter not in name:
+                continue
+            if kind not in content:
+                content[kind] = fixtures.load(kind, size, options.fixtures)
+
+            result = measure_in_child(setup, run, content[kind])
+            if 'error' in result:
+                print '%-28s %s' % (name, result['error'])
+                regressions.append((name, [result['error']]))
+                continue
+            results[name] = result
+
+            # compare it with the baseline
+            change = ''
+            if name in baseline:
+                if baseline[name].get('records_per_sec'):
+                    change = '%+.0f%%' % ((result['records_per_sec'] / baseline[name]['records_per_sec'] - 1) * 100)
+                problems = compare(result, baseline[name], options.tolerance)
+                if problems:
+                    regressions.append((name, problems))
+                    change += ' REGRESSION'
+            peak = '%d' % result['peak_kb'] if result['peak_kb'] is not None else 'n/a'
+            print '%-28s %8d %14.0f %12.1f %10s  %s' % (name, result['records'], result['records_per_sec'],
+                                                        result['objects_per_record'], peak, change)
+
+    if options.save:
+        with open(options.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print '\nSaved the baseline to %s' % options.baseline
+    elif not baseline:
+        print '\nNo baseline to compare against; run with --save to record one'
+
+    if regressions:
+        print '\n%d regression(s):' % len(regressions)
+        for name, problems in regressions:
+            print '  %s: %s' % (name, '; '.join(problems))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""Benchmark the Highrise timestamp codec against the strptime/strftime
+path pyrise used to use, and eager vs. lazy timestamp conversion in
+from_xml. Run it from the root of the repository:
+
+    $ python benchmarks/timestamps.py
+"""
+
+import os
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from pyrise import *
+from pyrise import _parse_datetime, _format_datetime
+
+TIMESTAMP = '2011-09-01T10:00:00Z'
+VALUE = datetime(2011, 9, 1, 10, 0, 0)
+
+TASK_XML = ElementTree.fromstring('''<task>
+  <id type="integer">1</id>
+  <body>Call Inkbert back</body>
+  <frame>specific</frame>
+  <due-at type="datetime">2011-09-03T17:00:00Z</due-at>
+  <alert-at type="datetime">2011-09-03T16:45:00Z</alert-at>
+  <created-at type="datetime">2011-09-01T10:00:00Z</created-at>
+  <updated-at type="datetime">2011-09-02T10:00:00Z</updated-at>
+</task>''')
+
+
+def strptime_parse():
+    return Highrise.from_utc(datetime.strptime(TIMESTAMP, '%Y-%m-%dT%H:%M:%SZ'))
+
+
+def strftime_format():
+    return datetime.strftime(Highrise.to_utc(VALUE), '%Y-%m-%dT%H:%M:%SZ')
+
+
+def lazy_from_xml():
+    Highrise.set_lazy_timestamps(True)
+    try:
+        return Task.from_xml(TASK_XML)
+    finally:
+        Highrise.set_lazy_timestamps(False)
+
+
+def main():
+    cases = [
+        ('strptime + from_utc', strptime_parse),
+        ('_parse_datetime', lambda: _parse_datetime(TIMESTAMP)),
+        ('strftime + to_utc', strftime_format),
+        ('_format_datetime', lambda: _format_datetime(VALUE)),
+        ('Task.from_xml (eager)', lambda: Task.from_xml(TASK_XML)),
+        ('Task.from_xml (lazy)', lazy_from_xml),
+    ]
+
+    print '%-24s %12s' % ('', 'usec/call')
+    for name, func in cases:
+        usec = min(timeit.repeat(func, number=20000, repeat=3)) / 20000 * 1e6
+        print '%-24s %12.2f' % (name, usec)
+
+
+if __name__ == '__main__':
+    main()
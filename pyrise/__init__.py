@@ -1,27 +1,523 @@
 import httplib2
 import urllib
+import hashlib
+import json
+import os
+import Queue
+import random
 import re
 import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from cStringIO import StringIO
 from datetime import datetime, timedelta
+from email.utils import parsedate_tz, mktime_tz
+from multiprocessing.pool import Pool, ThreadPool
+from types import MethodType
 from xml.etree import ElementTree
+try:
+    from xml.etree.cElementTree import iterparse
+except ImportError:
+    from xml.etree.ElementTree import iterparse
 
 #__version__ = '0.4.3'
 
-class Highrise:
-    """Class designed to handle all interactions with the Highrise API."""
-    
-    _http = httplib2.Http(disable_ssl_certificate_validation=True)
+class ConnectionPool(object):
+    """A thread-safe pool of keep-alive HTTP connections. Each request
+    leases a connection for as long as it is in flight, and at most
+    size connections are ever open at once."""
+
+    def __init__(self, size=10, credentials=None):
+        self.size = size
+        self.credentials = credentials
+        self._idle = []
+        self._lock = threading.Lock()
+        self._available = threading.Semaphore(size)
+        self._in_use = 0
+        self._created = 0
+        self._leases = 0
+        self._waits = 0
+
+    @contextmanager
+    def lease(self):
+        """Borrow a connection, waiting for one to be returned to the
+        pool if they are all in use"""
+
+        if not self._available.acquire(False):
+            with self._lock:
+                self._waits += 1
+            self._available.acquire()
+
+        try:
+            # reuse an idle connection if there is one, otherwise open one
+            with self._lock:
+                self._in_use += 1
+                self._leases += 1
+                credentials = self.credentials
+                http = self._idle.pop() if self._idle else None
+                if http is None:
+                    self._created += 1
+            if http is None:
+                http = httplib2.Http(disable_ssl_certificate_validation=True)
+                if credentials:
+                    http.add_credentials(*credentials)
+
+            try:
+                yield http
+            except:
+                # the connection may be in an unknown state, so don't reuse it
+                http = None
+                raise
+
+            finally:
+                # put the connection back, unless the credentials have changed
+                with self._lock:
+                    self._in_use -= 1
+                    if http is not None and credentials == self.credentials:
+                        self._idle.append(http)
+        finally:
+            self._available.release()
+
+    def set_credentials(self, credentials):
+        """Use new credentials for all connections from now on"""
+
+        with self._lock:
+            self.credentials = credentials
+            self._idle = []
+
+    def stats(self):
+        """Return a dictionary describing the current state of the pool"""
+
+        with self._lock:
+            return {
+                'size': self.size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'created': self._created,
+                'leases': self._leases,
+                'waits': self._waits,
+            }
+
+
+class TokenBucket(object):
+    """A thread-safe token bucket allowing bursts of up to `requests`
+    requests, refilled at a rate of `requests` every `per` seconds"""
+
+    def __init__(self, requests, per=10):
+        self.capacity = float(requests)
+        self.rate = requests / float(per)
+        self._tokens = self.capacity
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token from the bucket, sleeping until one is available"""
+
+        while True:
+            with self._lock:
+                now = time.time()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class CircuitBreaker(object):
+    """Fail fast once `threshold` requests in a row have failed to reach
+    Highrise, letting a single request through again after `cooldown`
+    seconds to see whether it has recovered"""
+
+    def __init__(self, threshold=5, cooldown=30):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    def check(self):
+        """Raise CircuitOpen if requests shouldn't be sent right now"""
+
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self._opened_at + self.cooldown - time.time()
+            if remaining > 0:
+                raise CircuitOpen, 'Too many gateway failures; not retrying for another %d seconds' % remaining
+
+            # let this request through as a trial, and hold off everyone
+            # else for another cooldown period unless it succeeds
+            self._opened_at = time.time()
+
+    def success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.threshold:
+                self._opened_at = time.time()
+
+
+class ResponseCache(object):
+    """An on-disk cache of GET responses, keyed by URL, that lets requests
+    be revalidated with If-None-Match/If-Modified-Since. The least recently
+    used responses are evicted once the cache grows past max_size bytes.
+
+    The most recently parsed responses (up to memo_size of them) are also
+    kept in memory, so a 304 doesn't even need to be parsed again."""
+
+    def __init__(self, directory, max_size=100 * 1024 * 1024, memo_size=128):
+        self.directory = directory
+        self.max_size = max_size
+        self.memo_size = memo_size
+        self._memo = {}
+        self._lock = threading.Lock()
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._size = sum(os.path.getsize(os.path.join(directory, name))
+                         for name in os.listdir(directory) if name.endswith('.xml'))
+
+    def _path(self, url):
+        return os.path.join(self.directory, hashlib.sha1(url).hexdigest() + '.xml')
+
+    def get(self, url):
+        """Return the validators and body cached for a URL, as a tuple
+        of (etag, last_modified, content), or None if it isn't cached"""
+
+        path = self._path(url)
+        try:
+            with open(path, 'rb') as f:
+                header = json.loads(f.readline())
+                content = f.read()
+            os.utime(path, None)
+        except (IOError, OSError, ValueError):
+            return None
+        return header.get('etag'), header.get('last_modified'), content
+
+    def set(self, url, etag, last_modified, content):
+        """Store a response along with its validators"""
+
+        path = self._path(url)
+        header = json.dumps({'url': url, 'etag': etag, 'last_modified': last_modified})
+        temp = '%s.%s.tmp' % (path, threading.current_thread().ident)
+        with open(temp, 'wb') as f:
+            f.write(header + '\n')
+            f.write(content)
+        with self._lock:
+            if os.path.exists(path):
+                self._size -= os.path.getsize(path)
+            os.rename(temp, path)
+            self._size += os.path.getsize(path)
+            if self._size > self.max_size:
+                self._evict()
+
+    def _evict(self):
+        """Remove the least recently used responses until the cache is
+        back down to 90% of max_size"""
+
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.xml'):
+                path = os.path.join(self.directory, name)
+                try:
+                    entries.append((os.path.getmtime(path), os.path.getsize(path), path))
+                except OSError:
+                    pass
+        entries.sort()
+        for mtime, size, path in entries:
+            if self._size <= self.max_size * 0.9:
+                break
+            try:
+                os.remove(path)
+                self._size -= size
+            except OSError:
+                pass
+
+    def parse(self, url, content):
+        """Parse a response body, reusing the tree from the last time this
+        URL returned the same content if we still have it in memory"""
+
+        memo = self._memo.get(url)
+        if memo is not None and memo[0] == content:
+            return memo[1]
+
+        xml = ElementTree.fromstring(content)
+        with self._lock:
+            if len(self._memo) >= self.memo_size:
+                self._memo.pop(next(iter(self._memo)))
+            self._memo[url] = (content, xml)
+        return xml
+
+
+class RequestMetrics(object):
+    """Counters and latency histograms for the requests pyrise sends,
+    kept in memory. Install one with Highrise.set_metrics, then look at
+    stats() or dump() whenever you like.
+
+    Requests are grouped by method and endpoint, which is the path with
+    any IDs replaced by # (e.g. 'GET /people/#.xml')."""
+
+    # upper bounds of the latency histogram buckets, in seconds (anything
+    # slower goes in one last bucket)
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far"""
+
+        with self._lock:
+            self._requests = {}
+            self._statuses = {}
+            self._parsing = {'responses': 0, 'seconds': 0.0, 'objects': 0, 'build_seconds': 0.0}
+
+    def _entry(self, info):
+        key = '%s %s' % (info['method'], info['endpoint'])
+        entry = self._requests.get(key)
+        if entry is None:
+            entry = self._requests[key] = {
+                'count': 0,
+                'errors': 0,
+                'retries': 0,
+                'cached': 0,
+                'seconds': 0.0,
+                'max_seconds': 0.0,
+                'bytes_out': 0,
+                'bytes_in': 0,
+                'histogram': [0] * (len(self.BUCKETS) + 1),
+            }
+        return entry
+
+    def record(self, event, info):
+        """Record an event passed on by Highrise (see Highrise.add_hook)"""
+
+        with self._lock:
+            if event == 'after_request':
+                entry = self._entry(info)
+                seconds = info['seconds']
+                entry['count'] += 1
+                entry['seconds'] += seconds
+                entry['max_seconds'] = max(entry['max_seconds'], seconds)
+                entry['bytes_out'] += info['bytes_out']
+                entry['bytes_in'] += info['bytes_in']
+                if info['error'] is not None:
+                    entry['errors'] += 1
+                if info['cached']:
+                    entry['cached'] += 1
+                bucket = 0
+                while bucket < len(self.BUCKETS) and seconds > self.BUCKETS[bucket]:
+                    bucket += 1
+                entry['histogram'][bucket] += 1
+                status = info['status']
+                self._statuses[status] = self._statuses.get(status, 0) + 1
+
+            elif event == 'retry':
+                self._entry(info)['retries'] += 1
+
+            elif event == 'parse':
+                self._parsing['responses'] += 1
+                self._parsing['seconds'] += info['seconds']
+                self._parsing['objects'] += info.get('objects', 0)
+                self._parsing['build_seconds'] += info.get('build_seconds', 0.0)
+
+    def percentile(self, key, fraction):
+        """Estimate a latency percentile (e.g. 0.95) for a method and
+        endpoint from its histogram, as the upper bound of the bucket it
+        falls in"""
+
+        with self._lock:
+            entry = self._requests.get(key)
+            if not entry or not entry['count']:
+                return None
+            target = entry['count'] * fraction
+            seen = 0
+            for bucket, count in enumerate(entry['histogram']):
+                seen += count
+                if seen >= target:
+                    break
+            if bucket < len(self.BUCKETS):
+                return self.BUCKETS[bucket]
+            return entry['max_seconds']
+
+    def stats(self):
+        """Return everything recorded so far as a dictionary"""
+
+        with self._lock:
+            requests = {}
+            for key, entry in self._requests.iteritems():
+                entry = dict(entry, histogram=list(entry['histogram']))
+                entry['average_seconds'] = entry['seconds'] / entry['count'] if entry['count'] else None
+                requests[key] = entry
+            return {
+                'requests': requests,
+                'statuses': dict((str(status), count) for status, count in self._statuses.iteritems()),
+                'parsing': dict(self._parsing),
+                'buckets': list(self.BUCKETS),
+            }
+
+    def dump(self, format='text'):
+        """Return the stats as JSON, or as a text table for people"""
+
+        stats = self.stats()
+        if format == 'json':
+            return json.dumps(stats, indent=2, sort_keys=True)
+        if format != 'text':
+            raise KeyError, 'format must be "text" or "json"'
+
+        lines = ['%-40s %7s %6s %7s %9s %9s %9s %11s %11s' % ('request', 'count', 'errors', 'retries',
+                                                           'avg ms', 'p95 ms', 'max ms', 'bytes out', 'bytes in')]
+        for key in sorted(stats['requests']):
+            entry = stats['requests'][key]
+            p95 = self.percentile(key, 0.95)
+            lines.append('%-40s %7d %6d %7d %9.1f %9s %9.1f %11d %11d' % (
+                key, entry['count'], entry['errors'], entry['retries'], (entry['average_seconds'] or 0) * 1000,
+                '-' if p95 is None else '%.1f' % (p95 * 1000), entry['max_seconds'] * 1000,
+                entry['bytes_out'], entry['bytes_in']))
+        lines.append('statuses: %s' % ', '.join('%s=%d' % item for item in sorted(stats['statuses'].iteritems())))
+        parsing = stats['parsing']
+        lines.append('parsing: %d responses in %.3fs, %d objects built in %.3fs' % (
+            parsing['responses'], parsing['seconds'], parsing['objects'], parsing['build_seconds']))
+        return '\n'.join(lines)
+
+
+class _clientmethod(object):
+    """A method of Highrise that works like a classmethod when it's called
+    on Highrise itself, but is bound to the instance when it's called on a
+    client, so the settings it changes only apply to that client"""
+
+    def __init__(self, func):
+        self.func = func
+        self.__doc__ = func.__doc__
+
+    def __get__(self, obj, type=None):
+        return MethodType(self.func, type if obj is None else obj)
+
+
+class Highrise(object):
+    """Class designed to handle all interactions with the Highrise API.
+
+    Everything is set up on the class itself (Highrise.set_server, etc.)
+    to talk to a single account. To talk to several at once, create a
+    client for each one and use the model classes on it instead:
+
+        >>> client = Highrise('my-server', 'api-key-goes-here')
+        >>> people = client.Person.all()
+
+    Each client has its own connection pool, caches, rate limit, circuit
+    breaker, hooks, and metrics. Settings that haven't been changed on a
+    client (like retries) follow Highrise's, and the time zone offset and
+    the pool for the a* methods are always shared."""
+
+    _pool = ConnectionPool()
+    _credentials = None
     _server = None
     _tzoffset = 0
-
-    @classmethod
+    _lazy_timestamps = False
+    _lazy_nested = False
+    _cache = None
+    _mirror = None
+    _limiter = None
+    _breaker = None
+    _retries = 3
+    _backoff = 1
+    _max_backoff = 30
+    _paused_until = 0
+    _async_workers = 8
+    _async_pool = None
+    _async_lock = threading.Lock()
+    _hooks = {}
+    _metrics = None
+    _read_ahead = 0
+    _read_ahead_pool = None
+    _read_ahead_lock = threading.Lock()
+    _parse_processes = 0
+    _parse_pool = None
+    _parse_lock = threading.Lock()
+
+    # the events hooks can be added for
+    HOOK_EVENTS = ('before_request', 'after_request', 'retry', 'parse')
+
+    def __init__(self, server=None, token=None, pool_size=10):
+        self._pool = ConnectionPool(pool_size)
+        self._credentials = None
+        self._server = None
+        self._cache = None
+        self._mirror = None
+        self._limiter = None
+        self._breaker = None
+        self._paused_until = 0
+        self._hooks = {}
+        self._metrics = None
+        self._read_ahead_pool = None
+        self._read_ahead_lock = threading.Lock()
+        self._classes = {}
+        self._classes_lock = threading.Lock()
+        if server is not None:
+            self.set_server(server)
+        if token is not None:
+            self.auth(token)
+
+    def __repr__(self):
+        return '<Highrise client for %s>' % self._server
+
+    def __getattr__(self, name):
+        """Get the model classes bound to this client (e.g. client.Person)"""
+
+        klass = globals().get(name)
+        if name[:1] != '_' and isinstance(klass, type) and issubclass(klass, HighriseObject):
+            return self._bind(klass)
+        raise AttributeError, "'Highrise' object has no attribute '%s'" % name
+
+    def _bind(self, klass):
+        """Get a subclass of a model class that sends its requests through
+        this client, with an object cache of its own"""
+
+        if klass._client is self:
+            return klass
+        if klass._client is not Highrise:
+            klass = klass.__bases__[0]
+
+        with self._classes_lock:
+            bound = self._classes.get(klass)
+            if bound is None:
+                namespace = {'__slots__': (), '__module__': klass.__module__, '__doc__': klass.__doc__,
+                             '_client': self, '_object_cache': None}
+                bound = self._classes[klass] = type(klass.__name__, (klass,), namespace)
+            return bound
+
+    @_clientmethod
     def auth(cls, token):
         """Define the settings used to connect to Highrise"""
         
-        # add the credentials to the HTTP connection
-        cls._http.add_credentials(token, 'X')
+        # add the credentials to the HTTP connections
+        cls._credentials = (token, 'X')
+        cls._pool.set_credentials(cls._credentials)
+
+    @_clientmethod
+    def set_pool_size(cls, size):
+        """Set the maximum number of connections to Highrise that can be
+        open (and requests in flight) at the same time"""
+
+        cls._pool = ConnectionPool(size, cls._credentials)
+
+    @_clientmethod
+    def pool_stats(cls):
+        """Return statistics about the connection pool: its size, how many
+        connections are in use or idle, how many have been created, how
+        many requests leased one, and how many had to wait for one"""
+
+        return cls._pool.stats()
     
-    @classmethod
+    @_clientmethod
     def set_server(cls, server):
         """Define the server to be used for API requests"""
         
@@ -30,6 +526,146 @@ class Highrise:
         else:
             cls._server = "https://%s.highrisehq.com" % server
 
+    @_clientmethod
+    def set_cache(cls, directory, max_size=100 * 1024 * 1024):
+        """Cache GET responses on disk in the given directory, and only
+        download them again if they've changed. Pass None to turn the
+        cache off."""
+
+        cls._cache = ResponseCache(directory, max_size) if directory else None
+
+    @_clientmethod
+    def set_mirror(cls, mirror):
+        """Set the local mirror (see pyrise.mirror) that get, filter and
+        Tag.get_by read from when they're passed source='local'"""
+
+        cls._mirror = mirror
+
+    @_clientmethod
+    def local_mirror(cls):
+        """Return the local mirror, or raise an error if there isn't one"""
+
+        if cls._mirror is None:
+            raise ElevatorError, 'You have to call Highrise.set_mirror before reading from the local mirror'
+        return cls._mirror
+
+    @_clientmethod
+    def add_hook(cls, event, hook):
+        """Call hook(info) whenever an event happens, where info is a
+        dictionary describing it. The events are:
+
+        before_request  method, path, endpoint
+        after_request   method, path, endpoint, status (None if Highrise
+                        couldn't be reached), seconds, bytes_out, bytes_in,
+                        cached (True if a 304 was served from the response
+                        cache), error (the exception raised, or None)
+        retry           method, path, endpoint, attempt, delay, error
+        parse           path, endpoint, seconds, and for lists, objects
+                        and build_seconds (the time spent in from_xml)
+
+        The endpoint is the path with any IDs replaced by # (e.g.
+        '/people/#.xml'), for grouping requests together."""
+
+        if event not in cls.HOOK_EVENTS:
+            raise KeyError, 'event must be one of %s' % ', '.join(cls.HOOK_EVENTS)
+
+        # replace the list rather than changing it, so requests in flight
+        # on other threads don't see it change under them
+        hooks = dict(cls._hooks)
+        hooks[event] = hooks.get(event, []) + [hook]
+        cls._hooks = hooks
+
+    @_clientmethod
+    def remove_hook(cls, event, hook):
+        """Stop calling a hook added with add_hook"""
+
+        hooks = dict(cls._hooks)
+        remaining = [h for h in hooks.get(event, []) if h != hook]
+        if remaining:
+            hooks[event] = remaining
+        else:
+            hooks.pop(event, None)
+        cls._hooks = hooks
+
+    @_clientmethod
+    def set_metrics(cls, metrics):
+        """Record every request in a RequestMetrics object (or pass None
+        to stop recording)"""
+
+        cls._metrics = metrics
+
+    @_clientmethod
+    def _instrumented(cls):
+        """Check whether anything is listening for events"""
+
+        return cls._metrics is not None or bool(cls._hooks)
+
+    @_clientmethod
+    def _emit(cls, event, info):
+        """Pass an event on to the metrics and any hooks"""
+
+        if cls._metrics is not None:
+            cls._metrics.record(event, info)
+        for hook in cls._hooks.get(event, ()):
+            hook(info)
+
+    @classmethod
+    def _endpoint(cls, path):
+        """Get the endpoint for a request path (e.g. '/people/#.xml')"""
+
+        return '/' + re.sub(r'/\d+(?=[/.]|$)', '/#', path.split('?')[0].strip('/'))
+
+    @_clientmethod
+    def set_rate_limit(cls, requests, per=10):
+        """Send at most this many requests to Highrise every `per` seconds
+        (Highrise allows 500 every 10 seconds). Pass None to turn off
+        client-side rate limiting."""
+
+        cls._limiter = TokenBucket(requests, per) if requests else None
+
+    @_clientmethod
+    def set_retries(cls, retries, backoff=1, max_backoff=30):
+        """Set how many times a request is retried when Highrise is
+        throttling us (503) or can't be reached (502). Retries wait for
+        the Retry-After time if one is sent, or back off exponentially
+        from `backoff` seconds (with jitter) up to `max_backoff`."""
+
+        cls._retries = retries
+        cls._backoff = backoff
+        cls._max_backoff = max_backoff
+
+    @_clientmethod
+    def set_circuit_breaker(cls, threshold, cooldown=30):
+        """Fail fast with CircuitOpen for `cooldown` seconds after
+        `threshold` consecutive gateway failures. Pass None to turn
+        the circuit breaker off."""
+
+        cls._breaker = CircuitBreaker(threshold, cooldown) if threshold else None
+
+    @classmethod
+    def set_async_workers(cls, workers):
+        """Set the maximum number of requests started with the a* methods
+        (aget, asave, adelete) that can be in flight at the same time"""
+
+        with cls._async_lock:
+            if cls._async_pool is not None:
+                cls._async_pool.close()
+                cls._async_pool = None
+            cls._async_workers = workers
+
+    @classmethod
+    def submit(cls, func, *args, **kwargs):
+        """Run func(*args) in the background without blocking the caller.
+
+        Returns an AsyncResult; call .get() on it to wait for the result,
+        or pass callback= to be handed the result when it is ready."""
+
+        callback = kwargs.pop('callback', None)
+        with cls._async_lock:
+            if cls._async_pool is None:
+                cls._async_pool = ThreadPool(cls._async_workers)
+            return cls._async_pool.apply_async(func, args, kwargs, callback)
+
     @classmethod
     def set_timezone_offset(cls, offset):
         """Rather than force pytz or some other time zone library, Pyrise
@@ -39,6 +675,98 @@ class Highrise:
 
         cls._tzoffset = offset
 
+    @_clientmethod
+    def set_lazy_timestamps(cls, lazy=True):
+        """Keep timestamps from Highrise as text until they're first used,
+        rather than converting every one of them to a datetime up front.
+        This is worthwhile when loading lots of objects whose dates you
+        mostly won't look at."""
+
+        cls._lazy_timestamps = lazy
+
+    @_clientmethod
+    def set_lazy_nested(cls, lazy=True):
+        """Keep nested objects from Highrise (contact data, the parties on
+        a deal, etc.) as XML until they're first used, rather than building
+        all of them up front. This is worthwhile when loading lots of
+        objects when you mostly only look at their top-level values."""
+
+        cls._lazy_nested = lazy
+
+    @_clientmethod
+    def set_read_ahead(cls, pages):
+        """Request up to this many pages of a list ahead of the one being
+        used (e.g. by all() or iter_filter()), all at the same time in the
+        background, so the next pages are on their way while the objects
+        on this one are built and used. Pages are only read ahead once a
+        list has a full first page, but up to that many extra requests may
+        still be sent past the end of it. Pass 0 to request each page only
+        when it's needed."""
+
+        with cls._read_ahead_lock:
+            cls._read_ahead = pages
+
+            # the threads are sized for the old setting, so start new ones
+            # the next time they're needed (any requests in flight finish)
+            if cls._read_ahead_pool is not None:
+                cls._read_ahead_pool.close()
+                cls._read_ahead_pool = None
+
+    @_clientmethod
+    def _read_ahead_threads(cls):
+        """Get the pool of threads pages are read ahead on, shared by all
+        of the lists being read through this client. There's no use in
+        more threads than connections, except to keep a single list's
+        pages in flight at the same time."""
+
+        with cls._read_ahead_lock:
+            if cls._read_ahead_pool is None:
+                cls._read_ahead_pool = ThreadPool(max(cls._read_ahead, cls._pool.size))
+            return cls._read_ahead_pool
+
+    @classmethod
+    def set_parse_processes(cls, processes):
+        """Build the objects on pages that are read ahead (see
+        set_read_ahead) in a pool of this many processes, so the work is
+        spread over more cores. Pass 0 to build them in this process.
+
+        This applies to the model classes themselves, but not to compact
+        ones, those bound to a client, or when nested objects are lazy;
+        their pages are always built here. If the processes can't be
+        started, pages are built here too."""
+
+        with cls._parse_lock:
+            if cls._parse_pool is not None:
+                cls._parse_pool.terminate()
+                cls._parse_pool = None
+            cls._parse_processes = processes
+
+    @classmethod
+    def _page_parser(cls, klass, tag):
+        """Get a function that starts building the objects on a page of
+        klass objects in the process pool, or None if they have to be
+        built in this process"""
+
+        if not cls._parse_processes or cls._lazy_nested:
+            return None
+        if getattr(sys.modules[__name__], klass.__name__, None) is not klass:
+            return None
+
+        with cls._parse_lock:
+            if cls._parse_pool is None and cls._parse_processes:
+                try:
+                    cls._parse_pool = Pool(cls._parse_processes)
+                except (OSError, ImportError):
+                    cls._parse_processes = 0
+            pool = cls._parse_pool
+        if pool is None:
+            return None
+
+        # the workers were started with whatever settings we had then, so
+        # send the ones that affect the objects along with each page
+        settings = {'_server': cls._server, '_tzoffset': cls._tzoffset, '_lazy_timestamps': cls._lazy_timestamps}
+        return lambda content: pool.apply_async(_parse_page, (klass.__name__, content, tag, settings))
+
     @classmethod
     def from_utc(cls, date):
         """Convert a date from UTC using the _tzoffset value"""
@@ -51,24 +779,201 @@ class Highrise:
 
         return date - timedelta(hours=cls._tzoffset)
     
-    @classmethod
+    @_clientmethod
     def request(cls, path, method='GET', xml=None):
         """Process an arbitrary request to Highrise.
         
         Ordinarily, you shouldn't have to call this method directly,
         but it's available to send arbitrary requests if needed."""
         
+        status, content = cls._send(path, method, xml)
+
+        # if this was a PUT or DELETE request, return status (hopefully success)
+        if method in ('PUT', 'DELETE'):
+            return status
+        
+        # for GET and POST requests, return the XML response
+        started = time.time()
+        try:
+            if method == 'GET' and cls._cache:
+                xml = cls._cache.parse(cls._url(path), content)
+            else:
+                xml = ElementTree.fromstring(content)
+        except:
+            raise UnexpectedResponse, "The server sent back something that wasn't valid XML."
+        if cls._instrumented():
+            cls._emit('parse', {'path': path, 'endpoint': cls._endpoint(path), 'seconds': time.time() - started})
+        return xml
+
+    @_clientmethod
+    def stream(cls, path, tag):
+        """Process a GET request to Highrise, yielding each <tag> element
+        as soon as it has been parsed instead of building the whole tree.
+
+        Each element is cleared once the caller moves on to the next one,
+        so use it (e.g. with from_xml) before advancing the iterator."""
+
+        status, content = cls._send(path)
+        return cls.iterparse(content, tag)
+
+    @_clientmethod
+    def iterparse(cls, content, tag):
+        """Incrementally parse an XML response, yielding the outermost
+        elements matching tag and discarding them once they're used"""
+
+        stack = []
+        depth = None
+        try:
+            for event, element in iterparse(StringIO(content), events=('start', 'end')):
+
+                # keep track of where we are in the document, and note the
+                # depth of the first matching element we run into
+                if event == 'start':
+                    if depth is None and element.tag == tag:
+                        depth = len(stack)
+                    stack.append(element)
+                    continue
+                stack.pop()
+                if depth != len(stack) or element.tag != tag:
+                    continue
+
+                # hand the finished element to the caller, then throw it away
+                yield element
+                element.clear()
+                if stack:
+                    stack[-1].remove(element)
+                depth = None
+
+        except SyntaxError:
+            raise UnexpectedResponse, "The server sent back something that wasn't valid XML."
+
+    @_clientmethod
+    def _send(cls, path, method='GET', xml=None):
+        """Send a request to Highrise and return the status and raw
+        content, raising the appropriate exception if there is an error.
+
+        Requests are held back by the rate limit and circuit breaker, and
+        retried if Highrise is throttling us or can't be reached."""
+
+        attempt = 0
+        while True:
+
+            # wait our turn
+            if cls._breaker:
+                cls._breaker.check()
+            pause = cls._paused_until - time.time()
+            if pause > 0:
+                time.sleep(pause)
+            if cls._limiter:
+                cls._limiter.acquire()
+
+            try:
+                result = cls._send_once(path, method, xml)
+
+            except (ServiceUnavailable, GatewayConnectionError), e:
+                # a 503 still means Highrise answered; only gateway errors
+                # count against the circuit breaker
+                if cls._breaker:
+                    if isinstance(e, ServiceUnavailable):
+                        cls._breaker.success()
+                    else:
+                        cls._breaker.failure()
+
+                # a POST that reached a broken gateway may have been
+                # processed, so only retry it if we were turned away
+                attempt += 1
+                if attempt > cls._retries or (method == 'POST' and not isinstance(e, ServiceUnavailable)):
+                    raise
+
+                # wait as long as we were asked to, or back off with jitter
+                delay = random.uniform(0, min(cls._max_backoff, cls._backoff * 2 ** (attempt - 1)))
+                if e.retry_after is not None:
+                    delay = max(delay, e.retry_after)
+                    cls._paused_until = max(cls._paused_until, time.time() + e.retry_after)
+                if cls._instrumented():
+                    cls._emit('retry', {'method': method, 'path': path, 'endpoint': cls._endpoint(path),
+                                        'attempt': attempt, 'delay': delay, 'error': e})
+                time.sleep(delay)
+                continue
+
+            except ElevatorError:
+                # so does any other error status (e.g. a 404), which has to
+                # close the circuit if this was its trial request
+                if cls._breaker:
+                    cls._breaker.success()
+                raise
+
+            if cls._breaker:
+                cls._breaker.success()
+            return result
+
+    @_clientmethod
+    def _send_once(cls, path, method='GET', xml=None):
+        """Send a single request to Highrise"""
+
         # build the base request URL
-        url = '%s/%s' % (cls._server, path.strip('/'))
+        url = cls._url(path)
+
+        # if we have a cached copy of this response, only ask for it again if it has changed
+        headers = {}
+        cached = None
+        if method == 'GET' and cls._cache:
+            cached = cls._cache.get(url)
+            if cached:
+                etag, last_modified = cached[:2]
+                if etag:
+                    headers['if-none-match'] = etag
+                if last_modified:
+                    headers['if-modified-since'] = last_modified
         
+        # let anything that's listening know the request is going out
+        instrumented = cls._instrumented()
+        if instrumented:
+            info = {'method': method, 'path': path, 'endpoint': cls._endpoint(path)}
+            cls._emit('before_request', dict(info))
+            started = time.time()
+
         # create the curl command
-        if method in ('GET', 'DELETE'):
-            request, content = cls._http.request(url, method=method)
-        else:
-            request, content = cls._http.request(url, method=method, body=xml, headers={'content-type': 'application/xml'})
-        
-        # raise appropriate exceptions if there is an error
+        try:
+            with cls._pool.lease() as http:
+                if method in ('GET', 'DELETE'):
+                    request, content = http.request(url, method=method, headers=headers)
+                else:
+                    headers['content-type'] = 'application/xml'
+                    request, content = http.request(url, method=method, body=xml, headers=headers)
+        except Exception, e:
+            if instrumented:
+                info.update(status=None, seconds=time.time() - started, bytes_out=len(xml or ''),
+                            bytes_in=0, cached=False, error=e)
+                cls._emit('after_request', info)
+            raise
+
         status = int(request['status'])
+        error = None
+        try:
+            return cls._handle_response(url, method, status, request, content, cached)
+        except Exception, e:
+            error = e
+            raise
+        finally:
+            if instrumented:
+                info.update(status=status, seconds=time.time() - started, bytes_out=len(xml or ''),
+                            bytes_in=len(content), cached=bool(cached and status == 304), error=error)
+                cls._emit('after_request', info)
+
+    @_clientmethod
+    def _handle_response(cls, url, method, status, request, content, cached):
+        """Turn a response into the status and content to return, raising
+        the appropriate exception if there is an error"""
+
+        # serve the cached copy if it hasn't changed, or cache the new one
+        if cached and status == 304:
+            return 200, cached[2]
+        if method == 'GET' and cls._cache and status == 200:
+            if 'etag' in request or 'last-modified' in request:
+                cls._cache.set(url, request.get('etag'), request.get('last-modified'), content)
+
+        # raise appropriate exceptions if there is an error
         if status >= 400:
             if status == 400:
                 raise BadRequest
@@ -80,22 +985,40 @@ class Highrise:
                 raise NotFound, content
             elif status == 422:
                 raise GatewayFailure, content
-            elif status == 502:
-                raise GatewayConnectionError, content
+            elif status in (502, 503):
+                if status == 502:
+                    error = GatewayConnectionError(content)
+                else:
+                    error = ServiceUnavailable(content)
+                error.retry_after = cls._retry_after(request.get('retry-after'))
+                raise error
             elif status == 507:
                 raise InsufficientStorage, content
             else:
                 raise UnexpectedResponse, content
-    
-        # if this was a PUT or DELETE request, return status (hopefully success)
-        if method in ('PUT', 'DELETE'):
-            return status
-        
-        # for GET and POST requests, return the XML response
+
+        return status, content
+
+    @_clientmethod
+    def _url(cls, path):
+        """Build the full URL for a request path"""
+
+        return '%s/%s' % (cls._server, path.strip('/'))
+
+    @classmethod
+    def _retry_after(cls, value):
+        """Convert a Retry-After header (either a number of seconds or an
+        HTTP date) to a number of seconds, or None if it's missing"""
+
+        if not value:
+            return None
         try:
-            return ElementTree.fromstring(content)
-        except:
-            raise UnexpectedResponse, "The server sent back something that wasn't valid XML."
+            return max(0, int(value))
+        except ValueError:
+            date = parsedate_tz(value)
+            if date is None:
+                return None
+            return max(0, mktime_tz(date) - time.time())
 
     @classmethod
     def key_to_class(cls, key):
@@ -124,156 +1047,1220 @@ class Highrise:
         return key[1:]
 
 
+class ObjectCache(object):
+    """A thread-safe cache of objects that keeps at most max_entries of
+    them, evicting the least recently used first, each for up to ttl
+    seconds"""
+
+    def __init__(self, ttl=300, max_entries=1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the object cached under key, or None"""
+
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or entry[0] < time.time():
+                self.misses += 1
+                return None
+
+            # move the entry to the most recently used end
+            self._entries[key] = entry
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, obj):
+        """Cache an object under key"""
+
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.time() + self.ttl, obj)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """Forget the object cached under key, if there is one"""
+
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return a dictionary of hit/miss counts and the cache size"""
+
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+            }
+
+
+class BackgroundIterator(object):
+    """Iterate over what func() yields, running it in the background (see
+    Highrise.submit) so items are ready by the time they're needed. Up to
+    buffer_size items are held waiting to be used; after that, the
+    background work waits too. If func raises an error, it's raised here
+    once the items before it have been used."""
+
+    _end = object()
+
+    def __init__(self, func, buffer_size=500):
+        self._queue = Queue.Queue(buffer_size)
+        self._closed = threading.Event()
+        self._finished = False
+        self.result = Highrise.submit(self._produce, func)
+
+    def _produce(self, func):
+        try:
+            for item in func():
+                if not self._put((item, None)):
+                    return
+        except Exception, e:
+            self._put((self._end, e))
+        else:
+            self._put((self._end, None))
+
+    def _put(self, entry):
+        """Wait for room in the buffer, unless the iterator is closed"""
+
+        while not self._closed.is_set():
+            try:
+                self._queue.put(entry, timeout=0.1)
+                return True
+            except Queue.Full:
+                pass
+        return False
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        if self._finished:
+            raise StopIteration
+        item, error = self._queue.get()
+        if item is self._end:
+            self._finished = True
+            if error is not None:
+                raise error
+            raise StopIteration
+        return item
+
+    def close(self):
+        """Stop iterating, letting the background work finish early"""
+
+        self._finished = True
+        self._closed.set()
+
+
+class BulkCheckpoint(object):
+    """A record of which items of a bulk operation have been completed,
+    appended to a file one line at a time so it survives a crash. Items
+    are identified by their position in the list passed to bulk_save or
+    bulk_delete and a key for the object that was there, along with the
+    ID they ended up with."""
+
+    def __init__(self, path):
+        self.path = path
+        self.completed = {}
+        self._lock = threading.Lock()
+
+        # read what was completed last time, ignoring a last line that
+        # was only partly written
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.completed[entry['index']] = entry.get('key'), entry['id']
+        self._file = open(path, 'a')
+
+    def record(self, index, key, id):
+        """Note that the item at index has been completed"""
+
+        with self._lock:
+            self.completed[index] = key, id
+            self._file.write(json.dumps({'index': index, 'key': key, 'id': id}) + '\n')
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def _checkpoint_key(obj):
+    """Identify an object in a bulk checkpoint by a hash of the XML that
+    would be sent to save it (leaving out the ID, which a new object only
+    gets once it has been saved)"""
+
+    body = StringIO()
+    obj.write_xml(body)
+    return unicode(hashlib.sha1(body.getvalue()).hexdigest())
+
+
+# how many objects Highrise sends on each page of its paginated lists, by
+# endpoint (see Highrise._endpoint); a shorter page is the last one
+PAGE_SIZES = {
+    '/people.xml': 500,
+    '/companies.xml': 500,
+    '/deals.xml': 500,
+    '/people/search.xml': 25,
+    '/companies/search.xml': 25,
+}
+for _subject in ('people', 'companies', 'deals', 'kases'):
+    PAGE_SIZES['/%s/#/notes.xml' % _subject] = 25
+    PAGE_SIZES['/%s/#/emails.xml' % _subject] = 25
+
+
+def _page_path(path, offset):
+    """Add the ?n= offset for a page of a list to a request path"""
+
+    if not offset:
+        return path
+    return '%s%sn=%s' % (path, '&' if '?' in path else '?', offset)
+
+
+class _ReadAhead(object):
+    """Request the pages of a list in the background on the client's read
+    ahead threads, starting with depth of them in flight ahead of the page
+    being used. The next one is requested each time a full page is used
+    (see request). If parse is given, it's called with each page as it
+    comes in, to start building its objects in another process."""
+
+    def __init__(self, client, path, offset, page_size, depth, parse=None):
+        self._client = client
+        self._path = path
+        self._offset = offset
+        self._page_size = page_size
+        self._parse = parse
+        self._pool = client._read_ahead_threads()
+        self._pending = deque()
+        for i in range(depth):
+            self.request()
+
+    def request(self):
+        """Start requesting the next page"""
+
+        page_path = _page_path(self._path, self._offset)
+        self._offset += self._page_size
+        self._pending.append(self._pool.apply_async(self._fetch, (page_path,)))
+
+    def _fetch(self, page_path):
+        status, content = self._client._send(page_path)
+        return page_path, content, self._parse(content) if self._parse else None
+
+    def next(self):
+        """Wait for the next page and return its path, content, and
+        pending objects (or None), raising the error if requesting it
+        failed"""
+
+        if not self._pending:
+            self.request()
+        return self._pending.popleft().get()
+
+    def close(self):
+        """Stop using the pages read ahead (any still in flight are left to
+        finish, and thrown away)"""
+
+        self._pending.clear()
+
+
+def _parse_page(name, content, tag, settings):
+    """Build the objects on a page of a list in a worker process (see
+    Highrise.set_parse_processes)"""
+
+    for key, value in settings.iteritems():
+        setattr(Highrise, key, value)
+    klass = getattr(sys.modules[__name__], name)
+    return [klass.from_xml(element) for element in Highrise.iterparse(content, tag)]
+
+
+def _run_concurrently(func, items, max_workers):
+    """Call func on each item using a bounded pool of threads, returning
+    the results in the same order as items. Exceptions are returned in
+    place of the result rather than raised, so one failure doesn't
+    abort the whole batch."""
+
+    def call(item):
+        try:
+            return func(item)
+        except Exception, e:
+            return e
+
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        return [call(item) for item in items]
+
+    pool = ThreadPool(min(max_workers, len(items)))
+    try:
+        return pool.map(call, items, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def prefetch(objs, *names, **kwargs):
+    """Load related collections (e.g. 'tags', 'notes', 'emails') for many
+    parties or deals at once, making up to max_workers (a keyword argument,
+    8 by default) requests concurrently. The collections are kept on each
+    object, so using them afterwards doesn't need any more requests.
+
+        >>> people = Person.filter(tag_id='1234')
+        >>> prefetch(people, 'tags', 'notes')
+
+    Collections that have already been loaded aren't requested again. If
+    any request fails, the first error is raised once the others have
+    finished. Returns objs as a list."""
+
+    max_workers = kwargs.pop('max_workers', 8)
+    if kwargs:
+        raise TypeError, 'prefetch() got an unexpected keyword argument \'%s\'' % kwargs.keys()[0]
+
+    # work out what needs loading, creating each object's cache up front
+    # so the threads don't race to do it
+    objs = list(objs)
+    pending = []
+    for obj in objs:
+        related = obj._related_cache()
+        for name in names:
+            if name not in obj.related:
+                raise KeyError, '%s objects don\'t have related "%s"' % (obj.__class__.__name__, name)
+            if name not in related:
+                pending.append((obj, name))
+
+    for result in _run_concurrently(lambda task: getattr(*task), pending, max_workers):
+        if isinstance(result, Exception):
+            raise result
+    return objs
+
+
+def _parse_datetime(text):
+    """Convert a Highrise timestamp (e.g. 2011-09-01T10:00:00Z) to a
+    datetime in local time"""
+
+    # the format is fixed, so slicing it up is much faster than strptime
+    if len(text) == 20 and text[4] == '-' and text[10] == 'T' and text[19] == 'Z':
+        try:
+            value = datetime(int(text[0:4]), int(text[5:7]), int(text[8:10]),
+                             int(text[11:13]), int(text[14:16]), int(text[17:19]))
+        except ValueError:
+            value = datetime.strptime(text, '%Y-%m-%dT%H:%M:%SZ')
+    else:
+        value = datetime.strptime(text, '%Y-%m-%dT%H:%M:%SZ')
+
+    if Highrise._tzoffset:
+        value = Highrise.from_utc(value)
+    return value
+
+
+def _format_datetime(value):
+    """Convert a datetime in local time to a Highrise timestamp"""
+
+    if Highrise._tzoffset:
+        value = Highrise.to_utc(value)
+    return '%04d-%02d-%02dT%02d:%02d:%02dZ' % (value.year, value.month, value.day,
+                                               value.hour, value.minute, value.second)
+
+
+def _escape_xml(text):
+    """Escape a value for the text of an XML element, writing anything
+    outside ASCII as a character reference (like ElementTree.tostring)"""
+
+    if not isinstance(text, unicode):
+        text = str(text).decode('utf-8')
+    if '&' in text:
+        text = text.replace('&', '&amp;')
+    if '<' in text:
+        text = text.replace('<', '&lt;')
+    if '>' in text:
+        text = text.replace('>', '&gt;')
+    return text.encode('ascii', 'xmlcharrefreplace')
+
+
+# a default that no value is ever equal to, for the fields whose defaults
+# are new objects or the current time
+_NO_DEFAULT = object()
+
+
+# functions to convert XML text based on its type attribute (anything
+# else is treated as a string)
+_XML_CONVERTERS = {
+    'integer': int,
+    'datetime': _parse_datetime,
+}
+
+# pyrise classes for the XML tags of nested objects
+_xml_classes = {}
+
+# compact versions of pyrise classes (see HighriseObject.compact)
+_compact_classes = {}
+
+def _xml_class(element):
+    """Get the pyrise class for a nested XML element"""
+
+    # parties could be either people or companies, so check their type
+    if element.tag == 'party':
+        return getattr(sys.modules[__name__], element.find('type').text)
+
+    klass = _xml_classes.get(element.tag)
+    if klass is None:
+        klass = getattr(sys.modules[__name__], Highrise.key_to_class(element.tag))
+        _xml_classes[element.tag] = klass
+    return klass
+
+
+class TrackedList(list):
+    """A list of nested objects (e.g. a person's email addresses) that
+    remembers whether it has been changed since it was loaded or saved"""
+
+    __slots__ = ('changed',)
+
+    def __init__(self, items=()):
+        list.__init__(self, items)
+        self.changed = False
+
+
+def _tracked(name):
+    """Wrap a list method so calling it marks a TrackedList as changed"""
+
+    method = getattr(list, name)
+    def wrapper(self, *args, **kwargs):
+        self.changed = True
+        return method(self, *args, **kwargs)
+    wrapper.__name__ = name
+    return wrapper
+
+for _name in ('append', 'extend', 'insert', 'pop', 'remove', 'reverse', 'sort', '__setitem__',
+              '__delitem__', '__setslice__', '__delslice__', '__iadd__', '__imul__'):
+    setattr(TrackedList, _name, _tracked(_name))
+
+
 class HighriseObject(object):
     """Base class for all Highrise data objects"""
     
+    __slots__ = ()
+    _instance_slots = ('_server', '_deferred', '_dirty', '_related')
+    _compact = False
+    _object_cache = None
+    _dirty = ()
+    _related = None
+
+    # the client requests are sent through: Highrise itself, or one of its
+    # instances for the classes bound to it (e.g. client.Person)
+    _client = Highrise
+
+    # the names of the related collections (e.g. 'tags') that can be
+    # loaded for many objects at once with prefetch
+    related = ()
+
+    @classmethod
+    def enable_cache(cls, ttl=300, max_entries=1000):
+        """Keep objects loaded with get() in memory for up to ttl seconds,
+        so getting the same object again doesn't go back to Highrise.
+        Objects are evicted from the cache when they are saved or deleted,
+        and the least recently used are dropped after max_entries."""
+
+        cls._object_cache = ObjectCache(ttl, max_entries)
+
+    @classmethod
+    def disable_cache(cls):
+        """Stop caching objects loaded with get()"""
+
+        cls._object_cache = None
+
+    @classmethod
+    def cache_stats(cls):
+        """Return the hit/miss counts and size of the object cache"""
+
+        if cls._object_cache is None:
+            return None
+        return cls._object_cache.stats()
+
+    @classmethod
+    def _get(cls, path, tag, id, source='remote'):
+        """Get a single object, from the object cache if it's enabled, or
+        from the local mirror if source is 'local'"""
+
+        if source == 'local':
+            return cls._client.local_mirror().get(cls, id)
+
+        # see if we already have this object
+        cache = cls._object_cache
+        key = (cls, str(id))
+        if cache is not None:
+            obj = cache.get(key)
+            if obj is not None:
+                return obj
+
+        # retrieve the object from Highrise
+        xml = cls._client.request(path)
+        for obj_xml in xml.getiterator(tag=tag):
+            obj = cls.from_xml(obj_xml)
+            if cache is not None:
+                cache.set(key, obj)
+            return obj
+
+    def _invalidate(self):
+        """Remove this object from the object cache, if it's in there"""
+
+        if self._object_cache is not None and self.id != None:
+            self._object_cache.invalidate((self.__class__, str(self.id)))
+
+    @classmethod
+    def get_many(cls, ids, max_workers=8):
+        """Get several objects at once, fetching up to max_workers of them
+        concurrently. Returns a list in the same order as ids; if an object
+        couldn't be retrieved, its place holds the exception instead
+        (e.g. a NotFound instance)."""
+
+        return _run_concurrently(cls.get, ids, max_workers)
+
+    def _related_cache(self):
+        """Get the dictionary holding the related collections loaded for
+        this object"""
+
+        related = getattr(self, '_related', None)
+        if related is None:
+            related = {}
+            object.__setattr__(self, '_related', related)
+        return related
+
+    def _get_related(self, name, load):
+        """Get a related collection, loading it the first time it's used"""
+
+        related = self._related_cache()
+        if name not in related:
+            related[name] = load()
+        return related[name]
+
+    def refresh_related(self, *names):
+        """Forget the related collections (e.g. 'tags') loaded for this
+        object, or all of them if no names are given, so they're requested
+        again the next time they're used"""
+
+        related = getattr(self, '_related', None)
+        if related:
+            for name in names or list(related):
+                related.pop(name, None)
+
+    @classmethod
+    def bulk_save(cls, objs, max_workers=8, checkpoint=None, key=None):
+        """Save many objects, up to max_workers of them concurrently (and
+        within any rate limit set with Highrise.set_rate_limit). Returns a
+        list in the same order as objs holding each saved object, or the
+        exception raised while saving it.
+
+        If checkpoint is the path of a file, each object is recorded there
+        once it's saved, so calling bulk_save again with the same objects
+        after a crash skips the ones that were already saved (new objects
+        are given the IDs Highrise assigned them the first time). Each
+        object is recorded with a key, so that if the objects don't match
+        the ones that were checkpointed (e.g. they're in a different
+        order) a ValueError is raised instead of skipping the wrong ones.
+        The key is a hash of the XML that would be sent for the object
+        (objects that have IDs are matched by ID instead), or whatever
+        key(obj) returns if key is given (which is needed if the objects'
+        values change between runs, like a default due_at)."""
+
+        def save(obj):
+            obj.save()
+            return obj
+
+        return cls._bulk(objs, save, max_workers, checkpoint, key)
+
+    @classmethod
+    def bulk_delete(cls, objs, max_workers=8, checkpoint=None, key=None):
+        """Delete many objects, up to max_workers of them concurrently.
+        Returns a list in the same order as objs holding each deleted
+        object, or the exception raised while deleting it (e.g. a
+        NotFound instance). See bulk_save for how checkpoint and key
+        work."""
+
+        def delete(obj):
+            obj.delete()
+            return obj
+
+        return cls._bulk(objs, delete, max_workers, checkpoint, key)
+
+    @classmethod
+    def _bulk(cls, objs, operation, max_workers, checkpoint, key=None):
+        """Run operation on each object concurrently, skipping the ones a
+        checkpoint file says were already done"""
+
+        objs = list(objs)
+        done = BulkCheckpoint(checkpoint) if checkpoint else None
+
+        # make sure the objects are the ones that were checkpointed before
+        # skipping any of them: objects with IDs (like the ones already
+        # saved, when retrying the failures in the same process) by ID,
+        # and the rest by key
+        if done is not None:
+            keys = [unicode(key(obj)) if key else _checkpoint_key(obj) for obj in objs]
+            for index, (recorded, id) in done.completed.iteritems():
+                if index >= len(objs):
+                    matches = False
+                elif objs[index].id != None and id is not None:
+                    matches = objs[index].id == id
+                else:
+                    matches = keys[index] == recorded
+                if not matches:
+                    done.close()
+                    raise ValueError, ('Object %d is not the one recorded in the checkpoint %s; the objects '
+                                       'have to be the same, in the same order' % (index, checkpoint))
+
+        def run(index):
+            obj = objs[index]
+
+            # if this was done on a previous run, just catch the object up
+            if done is not None and index in done.completed:
+                id = done.completed[index][1]
+                if obj.id == None and id is not None:
+                    object.__setattr__(obj, 'id', id)
+                    obj._track()
+                return obj
+
+            result = operation(obj)
+            if done is not None:
+                done.record(index, keys[index], obj.id)
+            return result
+
+        try:
+            return _run_concurrently(run, range(len(objs)), max_workers)
+        finally:
+            if done is not None:
+                done.close()
+
+    @classmethod
+    def aget(cls, id, callback=None):
+        """Get a single object without blocking. Returns an AsyncResult
+        (see Highrise.submit)."""
+
+        return Highrise.submit(cls.get, id, callback=callback)
+
+    @classmethod
+    def aiter_all(cls, buffer_size=500):
+        """Start iterating over all objects of this type (for the classes
+        with iter_all) in the background, without blocking. Returns a
+        BackgroundIterator right away; call close() on it to stop early."""
+
+        return BackgroundIterator(cls.iter_all, buffer_size)
+
+    def asave(self, callback=None):
+        """Save this object to Highrise without blocking. Returns an
+        AsyncResult (see Highrise.submit)."""
+
+        return Highrise.submit(self.save, callback=callback)
+
+    def adelete(self, callback=None):
+        """Delete this object from Highrise without blocking. Returns an
+        AsyncResult (see Highrise.submit)."""
+
+        return Highrise.submit(self.delete, callback=callback)
+
     @classmethod
     def from_xml(cls, xml, parent=None):
         """Create a new object from XML data"""
         
-        # instiantiate the object
-        self = cls()
+        # start with the defaults, leaving the ones that need to be created
+        # fresh (lists, nested objects, etc.) until we know which ones are
+        # actually missing from the XML
+        self = cls.__new__(cls)
+        static, dynamic = cls.__dict__.get('_defaults') or cls._compile_defaults()
+        values = static.copy()
+        values['_server'] = cls._client._server
+        if cls._compact:
+            values['_dirty'] = ()
+        deferred = None
         
-        for child in xml.getchildren():
-            
-            # convert the key to underscore notation for Python
-            key = child.tag.replace('-', '_')
+        # look up how to handle each of the tags we know about
+        plan = cls.__dict__.get('_plan') or cls._compile_plan()
+
+        for child in xml:
             
-            # if this key is not recognized by pyrise, ignore it
-            if key not in cls.fields:
+            # if this tag is not recognized by pyrise, ignore it
+            entry = plan.get(child.tag)
+            if entry is None:
                 continue
+            key, field, is_list = entry
         
             # if there is no data, just set the default
-            if child.text == None:
-                self.__dict__[key] = self.fields[key].default
-                continue
-
-            # handle the contact-data key differently
-            if key == 'contact_data':
-                klass = getattr(sys.modules[__name__], 'ContactData')
-                self.contact_data = klass.from_xml(child, parent=self)
+            if child.text == None and not len(child):
+                values[key] = cls._empty_value(field)
                 continue
 
-            # if this an element with children, it's an object relationship
-            if len(child.getchildren()) > 0:
-                
-                # is this element an array of objects?
-                if cls.fields[key].type == list:
-                    items = []
-                    for item in child.getchildren():
-                        if item.tag == 'party':
-                            class_string = item.find('type').text
-                        else:
-                            class_string = Highrise.key_to_class(item.tag)
-                        klass = getattr(sys.modules[__name__], class_string)
-                        items.append(klass.from_xml(item, parent=self))
-                    self.__dict__[child.tag.replace('-', '_')] = items
-                    continue
-                
-                # otherwise, let's treat it like a single object
+            # if this is contact data or an element with children, it's an
+            # object relationship: either an array of objects or a single one
+            if key == 'contact_data' or len(child):
+                if key == 'contact_data':
+                    convert = cls._nested(ContactData).from_xml
+                elif is_list:
+                    convert = cls._nested_list_from_xml
                 else:
-                    if child.tag == 'party':
-                        class_string = child.find('type').text
-                    else:
-                        class_string = Highrise.key_to_class(child.tag)
-                    klass = getattr(sys.modules[__name__], class_string)
-                    self.__dict__[child.tag.replace('-', '_')] = klass.from_xml(child, parent=self)
-                    continue
+                    convert = cls._nested_from_xml
+
+                # build the objects now, or hang onto the element until
+                # they're used (it stays intact even when the element it's
+                # in is cleared after parsing, since clear() isn't recursive)
+                if cls._client._lazy_nested:
+                    if deferred is None:
+                        deferred = {}
+                    deferred[key] = (convert, child)
+                    values.pop(key, None)
+                else:
+                    values[key] = convert(child)
+                continue
                 
-            # get and convert attribute value based on type
+            # convert the attribute value based on type, or hang onto the
+            # text until it's used for lazily converted timestamps
             data_type = child.get('type')
-            if data_type == 'integer':
-                value = int(child.text)
-            elif data_type == 'datetime':
-                value = Highrise.from_utc(datetime.strptime(child.text, '%Y-%m-%dT%H:%M:%SZ'))
-            else:
-                value = unicode(child.text)
+            if data_type == 'datetime' and cls._client._lazy_timestamps:
+                if deferred is None:
+                    deferred = {}
+                deferred[key] = (_parse_datetime, child.text)
+                values.pop(key, None)
+                continue
+            values[key] = _XML_CONVERTERS.get(data_type, unicode)(child.text)
 
-            # add value to object dictionary
-            self.__dict__[key] = value
-                
+        # fill in the rest of the defaults
+        for key, field in dynamic:
+            if key not in values and not (deferred and key in deferred):
+                values[key] = cls._empty_value(field)
+
+        if deferred:
+            values['_deferred'] = deferred
+        self._set_values(values)
         return self
 
     @classmethod
-    def _list(cls, path, tag):
-        """Get a list of objects of this type from Highrise"""
+    def _empty_value(cls, field):
+        """Create the default value for a field missing from the XML, with
+        lists and nested objects tracked like the ones that were loaded"""
+
+        if field.type == list:
+            return TrackedList()
+        if isinstance(field.type, type) and issubclass(field.type, HighriseObject):
+            value = cls._nested(field.type)()
+            value._track()
+            return value
+        return field.default
 
-        # retrieve the data from Highrise
-        objects = []
-        xml = Highrise.request(path)
+    @classmethod
+    def _nested_from_xml(cls, xml):
+        """Create a nested object from its XML element"""
 
-        # make a list of objects and return it
-        for item in xml.getiterator(tag=tag):
-            objects.append(cls.from_xml(item))
+        return cls._nested(_xml_class(xml)).from_xml(xml)
 
-        return objects
+    @classmethod
+    def _nested_list_from_xml(cls, xml):
+        """Create the list of nested objects for an array element"""
 
+        return TrackedList(cls._nested(_xml_class(item)).from_xml(item) for item in xml)
 
-    def __init__(self, parent=None, **kwargs):
-        """Create a new object manually."""
+    def __getattr__(self, name):
+        """Convert values that were deferred by from_xml the first time
+        they're used (this is only called for attributes that aren't set)"""
+
+        try:
+            deferred = object.__getattribute__(self, '_deferred')
+            convert, raw = deferred[name]
+        except (AttributeError, KeyError):
+            raise AttributeError, "'%s' object has no attribute '%s'" % (self.__class__.__name__, name)
+
+        value = convert(raw)
+        object.__setattr__(self, name, value)
+        deferred.pop(name, None)
+        return value
+
+    @classmethod
+    def compact(cls):
+        """Return a compact version of this class, which stores its values
+        in __slots__ rather than a dictionary per object. Compact objects
+        work just like regular ones (objects loaded through the compact
+        class, and their contact data, are compact too) but use a fraction
+        of the memory, which adds up when holding many thousands of them.
+
+        Note that compact classes are copies rather than subclasses, so
+        isinstance(Person.compact()(), Person) is False."""
+
+        if cls._compact:
+            return cls
+        klass = _compact_classes.get(cls)
+        if klass is not None:
+            return klass
+
+        # compact each of the base classes too, since any class along the
+        # way without __slots__ would give objects a dictionary anyway
+        bases = tuple(base.compact() if issubclass(base, HighriseObject) and base is not HighriseObject else base
+                      for base in cls.__bases__)
+
+        # nested objects should also be compact
+        fields = {}
+        for key, field in getattr(cls, 'fields', {}).iteritems():
+            if isinstance(field.type, type) and issubclass(field.type, HighriseObject):
+                field = HighriseField(type=field.type.compact(), options=field.options)
+            fields[key] = field
+
+        # add slots for all of the values not already covered by a base class
+        slotted = set()
+        for base in bases:
+            for ancestor in base.__mro__:
+                slotted.update(ancestor.__dict__.get('__slots__', ()))
+        slots = (set(fields) | set(HighriseObject._instance_slots)) - slotted
+
+        namespace = dict(cls.__dict__)
+        for name in ('__dict__', '__weakref__', '_plan', '_save_plan', '_defaults'):
+            namespace.pop(name, None)
+        namespace.update(fields=fields, __slots__=tuple(sorted(slots)), _compact=True)
+
+        klass = type(cls.__name__, bases, namespace)
+        _compact_classes[cls] = klass
+        return klass
 
-        self._server = Highrise._server
-        for field, settings in self.fields.iteritems():
-            if field in kwargs:
-                if not settings.is_editable:
-                    raise KeyError, '%s is not an editable attribute' % field
-                value = kwargs.pop(field)
+    @classmethod
+    def _nested(cls, klass):
+        """Get the class to use for an object nested inside one of these"""
+
+        if cls._compact:
+            klass = klass.compact()
+        if cls._client is not Highrise:
+            klass = cls._client._bind(klass)
+        return klass
+
+    @classmethod
+    def _model(cls, klass):
+        """Get the version of another model class (e.g. Tag) that sends
+        its requests through the same client as this one"""
+
+        if cls._client is Highrise:
+            return klass
+        return cls._client._bind(klass)
+
+    def _set_values(self, values):
+        """Set the values of this object from a dictionary"""
+
+        if self._compact:
+            for key, value in values.iteritems():
+                object.__setattr__(self, key, value)
+        else:
+            self.__dict__.update(values)
+
+    def _update(self, other):
+        """Update the values of this object to match another one, and
+        start tracking changes from there"""
+
+        values = {'_server': other._server}
+        for field in self.fields:
+            try:
+                values[field] = getattr(other, field)
+            except AttributeError:
+                pass
+        self._set_values(values)
+
+        # the new values replace any from_xml was keeping for later
+        deferred = getattr(self, '_deferred', None)
+        if deferred:
+            for key in values:
+                deferred.pop(key, None)
+        self._track()
+
+    def __setattr__(self, name, value):
+        """Remember which fields have been set, so save() only has to
+        send those"""
+
+        if name in self.fields:
+            dirty = self._dirty
+            if dirty:
+                dirty.add(name)
+            elif dirty is not None:
+                object.__setattr__(self, '_dirty', set([name]))
+
+            # a new value replaces one from_xml was keeping for later
+            deferred = getattr(self, '_deferred', None)
+            if deferred:
+                deferred.pop(name, None)
+        object.__setattr__(self, name, value)
+
+    def _track(self):
+        """Treat the current values of this object (and the objects
+        nested in it) as unchanged"""
+
+        deferred = getattr(self, '_deferred', None) or ()
+        for key, field in self.fields.iteritems():
+            # nested objects that haven't been built yet can't have changed
+            if key in deferred:
+                continue
+            if field.type == list:
+                value = getattr(self, key, None)
+                if isinstance(value, TrackedList):
+                    value.changed = False
+                elif value is not None:
+                    value = TrackedList(value)
+                    object.__setattr__(self, key, value)
+                for item in value or ():
+                    if isinstance(item, HighriseObject):
+                        item._track()
+            elif isinstance(field.type, type) and issubclass(field.type, HighriseObject):
+                value = getattr(self, key, None)
+                if value is not None:
+                    value._track()
+        object.__setattr__(self, '_dirty', ())
+
+    @property
+    def changed_fields(self):
+        """The names of the fields that have been changed since this object
+        was loaded from (or last saved to) Highrise, including fields
+        holding nested objects that have changed. This is None for objects
+        that were created manually and haven't been saved yet."""
+
+        if self._dirty is None:
+            return None
+        changed = set(self._dirty)
+        deferred = getattr(self, '_deferred', None) or ()
+        for key in self.fields:
+            if key in changed or key in deferred:
+                continue
+            value = getattr(self, key, None)
+            if isinstance(value, TrackedList):
+                if value.changed or any(isinstance(item, HighriseObject) and item.changed_fields for item in value):
+                    changed.add(key)
+            elif isinstance(value, HighriseObject) and value.changed_fields:
+                changed.add(key)
+        return changed
+
+    def _has_new_objects(self, keys):
+        """Check whether any of the given fields hold nested objects that
+        Highrise hasn't assigned an ID to yet"""
+
+        deferred = getattr(self, '_deferred', None) or ()
+        for key in keys:
+            if key in deferred:
+                continue
+            value = getattr(self, key, None)
+            for item in value if isinstance(value, list) else (value,):
+                if not isinstance(item, HighriseObject):
+                    continue
+                if 'id' in item.fields and item.id == None:
+                    return True
+                if item._has_new_objects(item.fields):
+                    return True
+        return False
+
+    def _save(self, path, refresh=False):
+        """Save this object to Highrise: POST it to path (e.g. '/deals')
+        if it's new, or otherwise PUT just the fields that have changed.
+        Nothing is sent at all if nothing has changed."""
+
+        changed = self.changed_fields
+
+        # if this was an initial save, update the object with the returned data
+        if self.id == None:
+            self._invalidate()
+            body = StringIO()
+            self.write_xml(body)
+            response = self._client.request('%s.xml' % path, method='POST', xml=body.getvalue())
+            self._update(self.from_xml(response))
+            return
+
+        # there's no need to send anything if nothing has changed
+        if changed is None or changed:
+            self._invalidate()
+            body = StringIO()
+            self.write_xml(body, only=changed)
+            self._client.request('%s/%s.xml' % (path, self.id), method='PUT', xml=body.getvalue())
+
+        # Highrise doesn't send the object back from a PUT request, so only
+        # re-request it if we were asked to, or if we need the IDs of new
+        # phone numbers, addresses, etc. (otherwise they'd be added again
+        # the next time the object is saved)
+        if refresh or self._has_new_objects(changed if changed is not None else self.fields):
+            self._invalidate()
+            self._update(self.get(self.id))
+        else:
+            self._track()
+
+    @classmethod
+    def _compile_defaults(cls):
+        """Split the default values for this class into a dictionary of
+        immutable values that every object can share, and a list of the
+        fields whose defaults have to be created fresh for each object"""
+
+        static = {}
+        dynamic = []
+        for key, field in cls.fields.iteritems():
+            if field.is_mutable:
+                dynamic.append((key, field))
             else:
-                value = settings.default
-            self.__dict__[field] = value
-        
-    
-    def save_xml(self, include_id=False, **kwargs):
-        """Return the object XML for sending back to Highrise"""
-        
-        # create new XML object
-        if 'base_element' not in kwargs:
-            kwargs['base_element'] = Highrise.class_to_key(self.__class__.__name__)
-        xml = ElementTree.Element(kwargs['base_element'])
-        
-        # if the id should be included and it is not None, add it first
-        if include_id and 'id' in self.__dict__ and self.id != None:
-            xml.insert(0, ElementTree.Element(tag='id', text=str(self.id)))
+                static[key] = field.default
 
-        # now iterate over the editable attributes
-        for field, settings in self.fields.iteritems():
-            
-            # get the value for this field, or pass if it is missing
-            if field in self.__dict__:
-                value = self.__dict__[field]
+        cls._defaults = static, dynamic
+        return cls._defaults
+
+    @classmethod
+    def _compile_plan(cls):
+        """Build the table from_xml uses to dispatch the XML tags for this
+        class: each tag maps to its attribute name, field settings, and
+        whether the field holds a list of objects"""
+
+        plan = {}
+        for key, field in cls.fields.iteritems():
+            entry = (key, field, field.type == list)
+            plan[key.replace('_', '-')] = entry
+            plan[key] = entry
+
+        cls._plan = plan
+        return plan
+
+    @classmethod
+    def _compile_save_plan(cls):
+        """Build the table write_xml works from: the element for this
+        class, then the name, XML tag, and default value of each editable
+        field"""
+
+        fields = []
+        for key, field in cls.fields.iteritems():
+            if not field.is_editable:
+                continue
+            if field.type == list:
+                default = []
+            elif field.is_mutable:
+                default = _NO_DEFAULT
             else:
+                default = field.default
+            fields.append((key, key.replace('_', '-'), default))
+
+        cls._save_plan = Highrise.class_to_key(cls.__name__), tuple(fields)
+        return cls._save_plan
+
+    @classmethod
+    def _iter_list(cls, path, tag, paginate=True):
+        """Iterate over objects of this type from Highrise, following the
+        ?n= offset pagination and yielding objects one page at a time.
+        If the first page is full, the next ones are requested in the
+        background if Highrise.set_read_ahead has been used."""
+
+        client = cls._client
+        offset = 0
+        largest = 0
+        page_size = PAGE_SIZES.get(Highrise._endpoint(path))
+        reader = None
+        try:
+            while True:
+
+                # add the offset to the query string for every page after the first
+                page_path = _page_path(path, offset) if paginate else path
+
+                # get the page from the read-ahead if it's running (and still
+                # agrees with us about where the page starts)
+                pending = None
+                if reader is not None:
+                    read_path, content, pending = reader.next()
+                    if read_path != page_path:
+                        reader.close()
+                        reader = None
+                if reader is None:
+                    status, content = client._send(page_path)
+
+                # use the objects built in another process if there are any,
+                # otherwise yield each object on this page as soon as it's
+                # parsed, keeping track of how long parsing and building the
+                # objects takes
+                count = 0
+                parsing = building = 0.0
+                if pending is not None:
+                    started = time.time()
+                    objs = pending.get()
+                    parsing = time.time() - started
+                    for obj in objs:
+                        count += 1
+                        yield obj
+                else:
+                    items = client.iterparse(content, tag)
+                    while True:
+                        started = time.time()
+                        item = next(items, None)
+                        parsed = time.time()
+                        parsing += parsed - started
+                        if item is None:
+                            break
+                        obj = cls.from_xml(item)
+                        building += time.time() - parsed
+                        count += 1
+                        yield obj
+
+                if client._instrumented():
+                    client._emit('parse', {'path': page_path, 'endpoint': Highrise._endpoint(page_path),
+                                           'seconds': parsing, 'objects': count, 'build_seconds': building})
+
+                # stop when this endpoint doesn't paginate, when we get back an
+                # empty page, or when the page is short: shorter than the
+                # endpoint's page size, or if that isn't known, shorter than
+                # the pages before it
+                if not paginate or count == 0 or count < (page_size or largest):
+                    break
+                largest = max(largest, count)
+                offset += count
+
+                # keep reading ahead, or start to once the first page is full
+                # (a list on a single page doesn't need it)
+                if reader is not None:
+                    reader.request()
+                elif client._read_ahead and page_size and count == page_size:
+                    reader = _ReadAhead(client, path, offset, page_size, client._read_ahead,
+                                        Highrise._page_parser(cls, tag))
+        finally:
+            if reader is not None:
+                reader.close()
+
+    @classmethod
+    def _list(cls, path, tag, paginate=True):
+        """Get a list of objects of this type from Highrise"""
+
+        return list(cls._iter_list(path, tag, paginate))
+
+
+    def __init__(self, parent=None, **kwargs):
+        """Create a new object manually."""
+
+        # start with the default values
+        static, dynamic = self.__class__.__dict__.get('_defaults') or self._compile_defaults()
+        values = static.copy()
+        for field, settings in dynamic:
+            if field not in kwargs:
+                values[field] = settings.default
+        values['_server'] = self._client._server
+
+        # then set any values we were given
+        for field, value in kwargs.iteritems():
+            settings = self.fields.get(field)
+            if settings is None:
                 continue
-            
-            # if the field is not editable, don't pass it
             if not settings.is_editable:
+                raise KeyError, '%s is not an editable attribute' % field
+            values[field] = value
+
+        values['_dirty'] = None
+        self._set_values(values)
+        
+    
+    def to_xml(self, tag=None):
+        """Return the complete XML for this object, including the values
+        that can't be edited, in the same form Highrise sends it (so that
+        from_xml will give back an identical object)"""
+
+        xml = ElementTree.Element(tag or Highrise.class_to_key(self.__class__.__name__))
+
+        # parties nested under a generic <party> tag need to say what they
+        # are (compact parties are copies, so they're checked separately)
+        if tag == 'party' and isinstance(self, (Party, Party.compact())):
+            ElementTree.SubElement(xml, 'type').text = self.__class__.__name__
+
+        for field in self.fields:
+            try:
+                value = getattr(self, field)
+            except AttributeError:
                 continue
-            
-            # if the value is equal to the default, don't pass it
-            if value == settings.default:
+            if value is None:
                 continue
-            
-            # if the value is a HighriseObject, insert the XML for it
+
+            key = field.replace('_', '-')
             if isinstance(value, HighriseObject):
-                xml.insert(0, value.save_xml(include_id=True))
+                xml.append(value.to_xml(key))
                 continue
-            
-            # insert the remaining single-attribute elements
-            e = ElementTree.Element(field.replace('_', '-'))
-            if isinstance(value, int):
+
+            e = ElementTree.SubElement(xml, key)
+            if isinstance(value, list):
+                e.set('type', 'array')
+                for item in value:
+                    e.append(item.to_xml())
+            elif isinstance(value, bool):
+                e.text = str(value).lower()
+            elif isinstance(value, (int, long)):
+                e.set('type', 'integer')
                 e.text = str(value)
+            elif isinstance(value, datetime):
+                e.set('type', 'datetime')
+                e.text = _format_datetime(value)
+            else:
+                e.text = value
+
+        return xml
+
+    def save_xml(self, include_id=False, only=None, **kwargs):
+        """Return the object XML for sending back to Highrise (just the
+        fields named in only, if it's given)"""
+
+        body = StringIO()
+        self.write_xml(body, include_id, only, kwargs.get('base_element'))
+        return ElementTree.fromstring(body.getvalue())
+
+    def write_xml(self, out, include_id=False, only=None, base_element=None):
+        """Write the object XML for sending back to Highrise (see save_xml)
+        to out, a file-like object such as a request body buffer. It's
+        written in one pass, without building an element tree first."""
+
+        self._write_xml(out.write, include_id, only, base_element)
+
+    def _write_xml(self, write, include_id, only, tag=None):
+        plan = self.__class__.__dict__.get('_save_plan') or self._compile_save_plan()
+        tag = tag or plan[0]
+        write('<%s>' % tag)
+
+        # if the id should be included and it is not None, add it first
+        if include_id:
+            id = getattr(self, 'id', None)
+            if id is not None:
+                write('<id>%s</id>' % _escape_xml(id))
+
+        # now write the editable fields
+        for field, key, default in plan[1]:
+
+            # if we're only sending some fields, send those even if they've
+            # been set back to the default (e.g. to clear them)
+            if only is not None and field not in only:
+                continue
+
+            # get the value for this field, or pass if it is missing
+            try:
+                value = getattr(self, field)
+            except AttributeError:
+                continue
+
+            # otherwise, if the value is equal to the default, don't pass it
+            if only is None and value == default:
+                continue
+
+            # nested objects and lists of them write their own XML
+            if isinstance(value, HighriseObject):
+                value._write_xml(write, True, None)
             elif isinstance(value, list):
-                if len(value) == 0:
+                if not value:
                     continue
+                write('<%s>' % key)
                 for item in value:
-                    e.insert(0, item.save_xml(include_id=True))
+                    item._write_xml(write, True, None)
+                write('</%s>' % key)
+            elif value is None:
+                write('<%s />' % key)
+            elif isinstance(value, bool):
+                write('<%s>%s</%s>' % (key, 'true' if value else 'false', key))
             elif isinstance(value, datetime):
-                e.text = datetime.strftime(Highrise.to_utc(value), '%Y-%m-%dT%H:%M:%SZ')
+                write('<%s>%s</%s>' % (key, _format_datetime(value), key))
             else:
-                e.text = value
-            xml.insert(0, e)
+                write('<%s>%s</%s>' % (key, _escape_xml(value), key))
 
-        # return the final XML Element object
-        return xml
+        write('</%s>' % tag)
 
 
 class HighriseField(object):
@@ -300,6 +2287,13 @@ class HighriseField(object):
         """Boolean flag for whether or not this field is editable"""
         
         return self.type not in ('id', 'uneditable')
+
+    @property
+    def is_mutable(self):
+        """Boolean flag for whether or not each object needs its own
+        default value (e.g. [] or datetime.now()) for this field"""
+
+        return self.type not in ('id', 'uneditable', str, unicode, int, bool)
         
 
 class Tag(HighriseObject):
@@ -314,69 +2308,63 @@ class Tag(HighriseObject):
     def all(cls):
         """Get all tags"""
 
-        return cls._list('tags.xml', 'tag')
+        return list(cls.iter_all())
+
+    @classmethod
+    def iter_all(cls):
+        """Iterate over all tags"""
+
+        return cls._iter_list('tags.xml', 'tag', paginate=False)
     
     @classmethod
-    def get_by(cls, subject, subject_id):
-        """Get tags for a specific person, company, case, or deal"""
+    def get_by(cls, subject, subject_id, source='remote'):
+        """Get tags for a specific person, company, case, or deal (pass
+        source='local' to read them from the local mirror)"""
+
+        if source == 'local':
+            return cls._client.local_mirror().tags(cls, subject, subject_id)
 
-        return cls._list('%s/%s/tags.xml' % (subject, subject_id), 'tag')
+        return cls._list('%s/%s/tags.xml' % (subject, subject_id), 'tag', paginate=False)
 
     @classmethod
     def add_to(cls, subject, subject_id, name):
         """Add a tag to a specific person, company, case, or deal"""
         
-        xml = ElementTree.Element(tag='name')
-        xml.text = name
-        xml_string = ElementTree.tostring(xml)
-        
-        response = Highrise.request('%s/%s/tags.xml' % (subject, subject_id), method='POST', xml=xml_string)
+        xml_string = '<name>%s</name>' % _escape_xml(name)
+        response = cls._client.request('%s/%s/tags.xml' % (subject, subject_id), method='POST', xml=xml_string)
         return cls.from_xml(response)
 
     @classmethod
     def remove_from(cls, subject, subject_id, tag_id):
         """Add a tag to a specific person, company, case, or deal"""
 
-        return Highrise.request('%s/%s/tags/%s.xml' % (subject, subject_id, tag_id), method='DELETE')
+        return cls._client.request('%s/%s/tags/%s.xml' % (subject, subject_id, tag_id), method='DELETE')
 
 
 class Message(HighriseObject):
     """An object representing a Highrise email or note."""
 
-    def __new__(cls, extended_fields={}, **kwargs):
-        """Set object attributes for subclasses of Party (companies and people)"""
-
-        # set the base fields dictionary and extend it with any additional fields
-        cls.fields = {
-            'id': HighriseField(type='id'),
-            'body': HighriseField(type=str),
-            'author_id': HighriseField(),
-            'subject_id': HighriseField(type=int),
-            'subject_type': HighriseField(type=str, options=('Party', 'Deal', 'Kase')),
-            'subject_name': HighriseField(),
-            'collection_id': HighriseField(type=int),
-            'collection_type': HighriseField(type=str, options=('Deal', 'Kase')),
-            'visible_to': HighriseField(type=str, options=('Everyone', 'Owner', 'NamedGroup')),
-            'owner_id': HighriseField(type=int),
-            'group_id': HighriseField(type=int),
-            'created_at': HighriseField(type=datetime),
-            'updated_at': HighriseField(),
-        }
-        cls.fields.update(extended_fields)
-
-        # send back the object reference
-        return HighriseObject.__new__(cls, **kwargs)
+    fields = {
+        'id': HighriseField(type='id'),
+        'body': HighriseField(type=str),
+        'author_id': HighriseField(),
+        'subject_id': HighriseField(type=int),
+        'subject_type': HighriseField(type=str, options=('Party', 'Deal', 'Kase')),
+        'subject_name': HighriseField(),
+        'collection_id': HighriseField(type=int),
+        'collection_type': HighriseField(type=str, options=('Deal', 'Kase')),
+        'visible_to': HighriseField(type=str, options=('Everyone', 'Owner', 'NamedGroup')),
+        'owner_id': HighriseField(type=int),
+        'group_id': HighriseField(type=int),
+        'created_at': HighriseField(type=datetime),
+        'updated_at': HighriseField(),
+    }
 
     @classmethod
-    def get(cls, id):
-        """Get a single message"""
-
-        # retrieve the data from Highrise
-        xml = Highrise.request('/%s/%s.xml' % (cls.plural, id))
+    def get(cls, id, source='remote'):
+        """Get a single message (pass source='local' to read it from the local mirror)"""
 
-        # return a note object
-        for obj_xml in xml.getiterator(tag=cls.singular):
-            return cls.from_xml(obj_xml)
+        return cls._get('/%s/%s.xml' % (cls.plural, id), cls.singular, id, source)
 
     @classmethod
     def filter(cls, **kwargs):
@@ -401,31 +2389,17 @@ class Message(HighriseObject):
         # return the list of messages from Highrise
         return cls._list(path, cls.singular)
 
-    def save(self):
-        """Save a message to Highrise."""
+    def save(self, refresh=False):
+        """Save a message to Highrise (pass refresh=True to re-request it
+        afterwards, e.g. to get the new updated_at)"""
 
-        # get the XML for the request
-        xml = self.save_xml()
-        xml_string = ElementTree.tostring(xml)
-
-        # if this was an initial save, update the object with the returned data
-        if self.id == None:
-            response = Highrise.request('/%s.xml' % self.plural, method='POST', xml=xml_string)
-            new = self.from_xml(response)
-
-        # if this was a PUT request, we need to re-request the object
-        # so we can get any new ID values set at ceation
-        else:
-            response = Highrise.request('/%s/%s.xml' % (self.plural, self.id), method='PUT', xml=xml_string)
-            new = cls.get(self.id)
-
-        # update the values of self to align with what came back from Highrise
-        self.__dict__ = new.__dict__
+        self._save('/%s' % self.plural, refresh)
 
     def delete(self):
         """Delete a message from Highrise."""
 
-        return Highrise.request('/%s/%s.xml' % (self.plural, self.id), method='DELETE')
+        self._invalidate()
+        return self._client.request('/%s/%s.xml' % (self.plural, self.id), method='DELETE')
 
 
 class Note(Message):
@@ -441,11 +2415,10 @@ class Email(Message):
     plural = 'emails'
     singular = 'email'
 
-    def __new__(cls, **kwargs):
-        extended_fields = {
-            'title': HighriseField(type=str),
-        }
-        return Message.__new__(cls, extended_fields, **kwargs)
+    fields = Message.fields.copy()
+    fields.update({
+        'title': HighriseField(type=str),
+    })
 
 
 class Deal(HighriseObject):
@@ -475,78 +2448,75 @@ class Deal(HighriseObject):
         'party_id': HighriseField(type=int),
     }        
 
+    related = ('notes', 'emails')
+
     @classmethod
     def all(cls):
         """Get all deals"""
 
-        return cls._list('deals.xml', 'deal')
+        return list(cls.iter_all())
 
     @classmethod
-    def get(cls, id):
-        """Get a single deal"""
+    def iter_all(cls):
+        """Iterate over all deals, one page at a time"""
+
+        return cls._iter_list('deals.xml', 'deal')
 
-        # retrieve the deal from Highrise
-        xml = Highrise.request('/deals/%s.xml' % id)
+    @classmethod
+    def get(cls, id, source='remote'):
+        """Get a single deal (pass source='local' to read it from the local mirror)"""
 
-        # return a deal object
-        for deal_xml in xml.getiterator(tag='deal'):
-            return Deal.from_xml(deal_xml)
+        return cls._get('/deals/%s.xml' % id, 'deal', id, source)
 
     @property
     def notes(self):
-        """Get the notes associated with this deal"""
+        """Get the notes associated with this deal (they're only requested
+        the first time; see refresh_related)"""
+
+        return self._get_related('notes', self._load_notes)
+
+    def _load_notes(self):
+        """Request the notes from Highrise"""
 
         # sanity check: has this deal been saved to Highrise yet?
         if self.id == None:
             raise ElevatorError, 'You have to save the deal before you can load its notes'
 
         # get the notes
-        return Note.filter(deal=self.id)
+        return self._model(Note).filter(deal=self.id)
 
     @property
     def emails(self):
-        """Get the emails associated with this deal"""
+        """Get the emails associated with this deal (they're only requested
+        the first time; see refresh_related)"""
+
+        return self._get_related('emails', self._load_emails)
+
+    def _load_emails(self):
+        """Request the emails from Highrise"""
 
         # sanity check: has this deal been saved to Highrise yet?
         if self.id == None:
             raise ElevatorError, 'You have to save the deal before you can load its emails'
 
         # get the emails
-        return Email.filter(deal=self.id)
-
-    def save(self):
-        """Save a deal to Highrise."""
-
-        # get the XML for the request
-        xml = self.save_xml()
-        xml_string = ElementTree.tostring(xml)
-
-        # if this was an initial save, update the object with the returned data
-        if self.id == None:
-            response = Highrise.request('/deals.xml', method='POST', xml=xml_string)
-            new = Deal.from_xml(response)
+        return self._model(Email).filter(deal=self.id)
 
-        # if this was a PUT request, we need to re-request the object
-        # so we can get any new ID values set at ceation
-        else:
-            response = Highrise.request('/deals/%s.xml' % self.id, method='PUT', xml=xml_string)
-            new = Deal.get(self.id)
+    def save(self, refresh=False):
+        """Save a deal to Highrise (pass refresh=True to re-request it
+        afterwards, e.g. to get the new updated_at)"""
 
-        # update the values of self to align with what came back from Highrise
-        self.__dict__ = new.__dict__
+        self._save('/deals', refresh)
     
     def set_status(self, status):
         """Change the status of a deal"""
 
         # prepare the XML string for submission
-        xml = ElementTree.Element('status')
-        xml_name = ElementTree.Element(tag='name')
-        xml_name.text = status
-        xml.insert(0, xml_name)
-        xml_string = ElementTree.tostring(xml)
+        xml_string = '<status><name>%s</name></status>' % _escape_xml(status)
         
         # submit the PUT request
-        response = Highrise.request('/deals/%s/status.xml' % self.id, method='PUT', xml=xml_string)
+        self._invalidate()
+        response = self._client.request('/deals/%s/status.xml' % self.id, method='PUT', xml=xml_string)
 
     def add_note(self, body, **kwargs):
         """Add a note to a deal"""
@@ -556,8 +2526,9 @@ class Deal(HighriseObject):
             raise ElevatorError, 'You have to save the deal before you can add a note'
 
         # add the note and save it to Highrise
-        note = Note(body=body, subject_id=self.id, subject_type='Deal', **kwargs)
+        note = self._model(Note)(body=body, subject_id=self.id, subject_type='Deal', **kwargs)
         note.save()
+        self.refresh_related('notes')
 
     def add_email(self, title, body, **kwargs):
         """Add an email to a deal"""
@@ -567,13 +2538,15 @@ class Deal(HighriseObject):
             raise ElevatorError, 'You have to save the deal before you can add an email'
 
         # add the email and save it to Highrise
-        email = Email(title=title, body=body, subject_id=self.id, subject_type='Deal', **kwargs)
+        email = self._model(Email)(title=title, body=body, subject_id=self.id, subject_type='Deal', **kwargs)
         email.save()
+        self.refresh_related('emails')
 
     def delete(self):
         """Delete a deal from Highrise."""
 
-        return Highrise.request('/deals/%s.xml' % self.id, method='DELETE')
+        self._invalidate()
+        return self._client.request('/deals/%s.xml' % self.id, method='DELETE')
 
 
 
@@ -602,44 +2575,31 @@ class Task(HighriseObject):
     def all(cls):
         """Get all tasks"""
 
-        return cls._list('tasks.xml', 'task')
+        return list(cls.iter_all())
 
     @classmethod
-    def get(cls, id):
-        """Get a single task"""
+    def iter_all(cls):
+        """Iterate over all tasks"""
 
-        # retrieve the task from Highrise
-        xml = Highrise.request('/tasks/%s.xml' % id)
-
-        # return a task object
-        for task_xml in xml.getiterator(tag='task'):
-            return Task.from_xml(task_xml)
-
-    def save(self):
-        """Save a task to Highrise."""
+        return cls._iter_list('tasks.xml', 'task', paginate=False)
 
-        # get the XML for the request
-        xml = self.save_xml()
-        xml_string = ElementTree.tostring(xml)
+    @classmethod
+    def get(cls, id, source='remote'):
+        """Get a single task (pass source='local' to read it from the local mirror)"""
 
-        # if this was an initial save, update the object with the returned data
-        if self.id == None:
-            response = Highrise.request('/tasks.xml', method='POST', xml=xml_string)
-            new = Task.from_xml(response)
+        return cls._get('/tasks/%s.xml' % id, 'task', id, source)
 
-        # if this was a PUT request, we need to re-request the object
-        # so we can get any new ID values set at ceation
-        else:
-            response = Highrise.request('/tasks/%s.xml' % self.id, method='PUT', xml=xml_string)
-            new = Task.get(self.id)
+    def save(self, refresh=False):
+        """Save a task to Highrise (pass refresh=True to re-request it
+        afterwards, e.g. to get the new updated_at)"""
 
-        # update the values of self to align with what came back from Highrise
-        self.__dict__ = new.__dict__
+        self._save('/tasks', refresh)
     
     def delete(self):
         """Delete a task from Highrise."""
 
-        return Highrise.request('/tasks/%s.xml' % self.id, method='DELETE')
+        self._invalidate()
+        return self._client.request('/tasks/%s.xml' % self.id, method='DELETE')
         
 
 class ContactData(HighriseObject):
@@ -738,40 +2698,51 @@ class WebAddress(ContactDetail):
 class Party(HighriseObject):
     """An object representing a Highrise person or company."""
 
-    def __new__(cls, extended_fields={}, **kwargs):
-        """Set object attributes for subclasses of Party (companies and people)"""
-
-        # set the base fields dictionary and extend it with any additional fields
-        cls.fields = {
-            'id': HighriseField(type='id'),
-            'background': HighriseField(type=str),
-            'visible_to': HighriseField(type=str, options=('Everyone', 'Owner', 'NamedGroup')),
-            'owner_id': HighriseField(type=int),
-            'group_id': HighriseField(type=int),
-            'contact_data': HighriseField(type=ContactData),
-            'author_id': HighriseField(),
-            'created_at': HighriseField(),
-            'updated_at': HighriseField(),
-        }
-        cls.fields.update(extended_fields)
-        
-        # send back the object reference
-        return HighriseObject.__new__(cls, **kwargs)
+    fields = {
+        'id': HighriseField(type='id'),
+        'background': HighriseField(type=str),
+        'visible_to': HighriseField(type=str, options=('Everyone', 'Owner', 'NamedGroup')),
+        'owner_id': HighriseField(type=int),
+        'group_id': HighriseField(type=int),
+        'contact_data': HighriseField(type=ContactData),
+        'author_id': HighriseField(),
+        'created_at': HighriseField(),
+        'updated_at': HighriseField(),
+    }
+
+    related = ('tags', 'notes', 'emails')
     
     @classmethod
     def all(cls):
         """Get all parties"""
 
-        return cls._list('%s.xml' % cls.plural, 'person')
+        return list(cls.iter_all())
+
+    @classmethod
+    def iter_all(cls):
+        """Iterate over all parties, one page at a time"""
+
+        return cls._iter_list('%s.xml' % cls.plural, cls.singular)
 
     @classmethod
     def filter(cls, **kwargs):
         """Get a list of parties based on filter criteria"""
+
+        return list(cls.iter_filter(**kwargs))
+
+    @classmethod
+    def iter_filter(cls, **kwargs):
+        """Iterate over the parties matching filter criteria (the same
+        ones filter accepts), one page at a time. Pass source='local' to
+        search the local mirror instead of Highrise."""
         
+        if kwargs.pop('source', 'remote') == 'local':
+            return cls._client.local_mirror().filter(cls, **kwargs)
+
         # if company_id or title are present in kwargs, we should be running
         # this against the Person object directly
         if ('company_id' in kwargs or 'title' in kwargs):
-            return Person._filter(**kwargs)
+            return iter(cls._model(Person)._filter(**kwargs))
     
         # get the path for filter methods that only take a single argument
         if 'term' in kwargs:
@@ -785,7 +2756,7 @@ class Party(HighriseObject):
                 raise KeyError, '"tag_id" can not be used with any other keyward arguments'
 
         elif 'since' in kwargs:
-            path = '/%s.xml?since=%s' % (cls.plural, datetime.strftime(Highrise.from_utc(kwargs['since']), '%Y%m%d%H%M%S'))
+            path = '/%s.xml?since=%s' % (cls.plural, datetime.strftime(Highrise.to_utc(kwargs['since']), '%Y%m%d%H%M%S'))
             if len(kwargs) > 1:
                 raise KeyError, '"since" can not be used with any other keyward arguments'
 
@@ -796,34 +2767,41 @@ class Party(HighriseObject):
                 path += 'criteria[%s]=%s&' % (key, urllib.quote(kwargs[key]))
             path = path[:-1]
 
-        # return the list of people from Highrise
-        return cls._list(path, cls.singular)
+        # return the people from Highrise
+        return cls._iter_list(path, cls.singular)
 
     @classmethod
-    def get(cls, id):
-        """Get a single party"""
+    def get(cls, id, source='remote'):
+        """Get a single party (pass source='local' to read it from the local mirror)"""
 
-        # retrieve the person from Highrise
-        xml = Highrise.request('/%s/%s.xml' % (cls.plural, id))
-        
-        # return a person object
-        for obj_xml in xml.getiterator(tag=cls.singular):
-            return cls.from_xml(obj_xml)
+        return cls._get('/%s/%s.xml' % (cls.plural, id), cls.singular, id, source)
 
     @property
     def tags(self):
-        """Get the tags associated with this party"""
-        
+        """Get the tags associated with this party (they're only requested
+        the first time; see refresh_related)"""
+
+        return self._get_related('tags', self._load_tags)
+
+    def _load_tags(self):
+        """Request the tags from Highrise"""
+
         # sanity check: has this person been saved to Highrise yet?
         if self.id == None:
             raise ElevatorError, 'You have to save the person before you can load their tags'
         
         # get the tags
-        return Tag.get_by(self.plural, self.id)
+        return self._model(Tag).get_by(self.plural, self.id)
     
     @property
     def notes(self):
-        """Get the notes associated with this party"""
+        """Get the notes associated with this party (they're only requested
+        the first time; see refresh_related)"""
+
+        return self._get_related('notes', self._load_notes)
+
+    def _load_notes(self):
+        """Request the notes from Highrise"""
 
         # sanity check: has this person been saved to Highrise yet?
         if self.id == None:
@@ -832,11 +2810,17 @@ class Party(HighriseObject):
         # get the notes
         kwargs = {}
         kwargs[self.singular] = self.id
-        return Note.filter(**kwargs)
+        return self._model(Note).filter(**kwargs)
 
     @property
     def emails(self):
-        """Get the emails associated with this party"""
+        """Get the emails associated with this party (they're only requested
+        the first time; see refresh_related)"""
+
+        return self._get_related('emails', self._load_emails)
+
+    def _load_emails(self):
+        """Request the emails from Highrise"""
 
         # sanity check: has this person been saved to Highrise yet?
         if self.id == None:
@@ -845,7 +2829,7 @@ class Party(HighriseObject):
         # get the emails
         kwargs = {}
         kwargs[self.singular] = self.id
-        return Email.filter(**kwargs)
+        return self._model(Email).filter(**kwargs)
     
     def add_tag(self, name):
         """Add a tag to a party"""
@@ -855,7 +2839,9 @@ class Party(HighriseObject):
             raise ElevatorError, 'You have to save the %s before you can add a tag' % self.singular
         
         # add the tag
-        return Tag.add_to(self.plural, self.id, name)
+        self._invalidate()
+        self.refresh_related('tags')
+        return self._model(Tag).add_to(self.plural, self.id, name)
 
     def remove_tag(self, tag_id):
         """Remove a tag from a party"""
@@ -865,7 +2851,9 @@ class Party(HighriseObject):
             raise ElevatorError, 'You have to save the %s before you can remove a tag' % self.singular
 
         # remove the tag
-        return Tag.remove_from(self.plural, self.id, tag_id)
+        self._invalidate()
+        self.refresh_related('tags')
+        return self._model(Tag).remove_from(self.plural, self.id, tag_id)
     
     def add_note(self, body, **kwargs):
         """Add a note to a party"""
@@ -875,8 +2863,9 @@ class Party(HighriseObject):
             raise ElevatorError, 'You have to save the %s before you can add a note' % self.singular
         
         # add the note and save it to Highrise
-        note = Note(body=body, subject_id=self.id, subject_type='Party', **kwargs)
+        note = self._model(Note)(body=body, subject_id=self.id, subject_type='Party', **kwargs)
         note.save()
+        self.refresh_related('notes')
 
     def add_email(self, title, body, **kwargs):
         """Add an email to a party"""
@@ -886,34 +2875,21 @@ class Party(HighriseObject):
             raise ElevatorError, 'You have to save the %s before you can add an email' % self.singular
 
         # add the email and save it to Highrise
-        email = Email(title=title, body=body, subject_id=self.id, subject_type='Party', **kwargs)
+        email = self._model(Email)(title=title, body=body, subject_id=self.id, subject_type='Party', **kwargs)
         email.save()
+        self.refresh_related('emails')
     
-    def save(self):
-        """Save a party to Highrise."""
-
-        # get the XML for the request
-        xml = self.save_xml()
-        xml_string = ElementTree.tostring(xml)
+    def save(self, refresh=False):
+        """Save a party to Highrise (pass refresh=True to re-request it
+        afterwards, e.g. to get the new updated_at)"""
 
-        # if this was an initial save, update the object with the returned data
-        if self.id == None:
-            response = Highrise.request('/%s.xml' % self.plural, method='POST', xml=xml_string)
-            new = Person.from_xml(response)
-
-        # if this was a PUT request, we need to re-request the object
-        # so we can get any new ID values for phone numbers, addresses, etc.
-        else:
-            response = Highrise.request('/%s/%s.xml' % (self.plural, self.id), method='PUT', xml=xml_string)
-            new = self.get(self.id)
-
-        # update the values of self to align with what came back from Highrise
-        self.__dict__ = new.__dict__
+        self._save('/%s' % self.plural, refresh)
 
     def delete(self):
         """Delete a party from Highrise."""
 
-        return Highrise.request('/%s/%s.xml' % (self.plural, self.id), method='DELETE')
+        self._invalidate()
+        return self._client.request('/%s/%s.xml' % (self.plural, self.id), method='DELETE')
 
 
 class Person(Party):
@@ -922,15 +2898,14 @@ class Person(Party):
     plural = 'people'
     singular = 'person'
 
-    def __new__(cls, **kwargs):
-        extended_fields = {
-            'first_name': HighriseField(type=str),
-            'last_name': HighriseField(type=str),
-            'title': HighriseField(type=str),
-            'company_id': HighriseField(type=int),
-            'company_name': HighriseField(),
-        }
-        return Party.__new__(cls, extended_fields, **kwargs)
+    fields = Party.fields.copy()
+    fields.update({
+        'first_name': HighriseField(type=str),
+        'last_name': HighriseField(type=str),
+        'title': HighriseField(type=str),
+        'company_id': HighriseField(type=int),
+        'company_name': HighriseField(),
+    })
 
     @classmethod
     def _filter(cls, **kwargs):
@@ -941,6 +2916,7 @@ class Person(Party):
             path = '/companies/%s/people.xml' % kwargs['company_id']
             if len(kwargs) > 1:
                 raise KeyError, '"company_id" can not be used with any other keyward arguments'
+            return cls._list(path, 'person', paginate=False)
 
         # get all people will a specific title
         elif 'title' in kwargs:
@@ -958,11 +2934,10 @@ class Company(Party):
     plural = 'companies'
     singular = 'company'
 
-    def __new__(cls, **kwargs):
-        extended_fields = {
-            'name': HighriseField(type=str),
-        }
-        return Party.__new__(cls, extended_fields, **kwargs)
+    fields = Party.fields.copy()
+    fields.update({
+        'name': HighriseField(type=str),
+    })
 
 
 class ElevatorError(Exception):
@@ -990,6 +2965,10 @@ class GatewayFailure(ElevatorError):
 
 
 class GatewayConnectionError(ElevatorError):
+    retry_after = None
+
+
+class CircuitOpen(GatewayConnectionError):
     pass
 
 
@@ -997,5 +2976,9 @@ class UnexpectedResponse(ElevatorError):
     pass
 
 
+class ServiceUnavailable(UnexpectedResponse):
+    retry_after = None
+
+
 class InsufficientStorage(ElevatorError):
     pass
@@ -0,0 +1,247 @@
+"""Stream Highrise data straight into NDJSON, CSV, or Parquet files.
+
+    >>> from pyrise.export import export
+    >>> export('/data/highrise', ('people', 'companies', 'deals'), format='csv')
+    {'people': 204113, 'companies': 18321, 'deals': 5120}
+
+Objects are written as each page comes back from Highrise, so memory use
+stays flat however big the account is, and the resources are exported in
+parallel. Contact data is flattened into one column per kind of contact
+detail (e.g. "joe@schmoe.com (Work); joe@gmail.com (Home)").
+
+Parquet files need pyarrow to be installed; the other formats don't need
+anything beyond the standard library.
+"""
+
+import csv
+import json
+import os
+from datetime import datetime
+
+from pyrise import HighriseObject, Person, Company, Deal, Task, Tag, _format_datetime, _run_concurrently
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# the classes for each resource that can be exported
+RESOURCES = {
+    'people': Person,
+    'companies': Company,
+    'deals': Deal,
+    'tasks': Task,
+    'tags': Tag,
+}
+
+# the attribute used to describe each kind of contact detail
+CONTACT_DETAILS = (
+    ('email_addresses', 'address'),
+    ('phone_numbers', 'number'),
+    ('addresses', None),
+    ('web_addresses', 'url'),
+    ('instant_messengers', 'address'),
+    ('twitter_accounts', 'username'),
+)
+
+FORMATS = ('ndjson', 'csv', 'parquet')
+
+
+def columns(klass):
+    """Return the flattened column names for a class, in order"""
+
+    names = []
+    for field in sorted(klass.fields):
+        if field == 'contact_data':
+            names += [name for name, attribute in CONTACT_DETAILS]
+        else:
+            names.append(field)
+    return names
+
+
+def flatten(obj):
+    """Turn an object into a dictionary of plain values (strings, numbers,
+    and None), with its contact data flattened into one value per kind
+    of contact detail"""
+
+    row = {}
+    for field in obj.fields:
+        value = getattr(obj, field)
+        if field == 'contact_data':
+            for name, attribute in CONTACT_DETAILS:
+                details = getattr(value, name, None) if value is not None else None
+                row[name] = '; '.join(_describe(detail, attribute) for detail in details) if details else None
+        else:
+            row[field] = _plain(value)
+    return row
+
+
+def _describe(detail, attribute):
+    """Describe a contact detail, e.g. 'joe@schmoe.com (Work)'"""
+
+    if attribute is None:
+        text = ', '.join(part for part in (detail.street, detail.city, detail.state, detail.zip, detail.country) if part)
+    else:
+        text = getattr(detail, attribute) or ''
+    if detail.location:
+        text = '%s (%s)' % (text, detail.location)
+    return text
+
+
+def _plain(value):
+    """Convert a value to something every format can store"""
+
+    if isinstance(value, datetime):
+        return _format_datetime(value)
+    if isinstance(value, HighriseObject):
+        return getattr(value, 'id', None)
+    if isinstance(value, list):
+        return ' '.join(str(getattr(item, 'id', '')) for item in value) or None
+    if value == '':
+        return None
+    return value
+
+
+class NDJSONWriter(object):
+    """Write one JSON object per line"""
+
+    extension = 'ndjson'
+
+    def __init__(self, path, columns):
+        self.file = open(path, 'wb')
+
+    def write(self, row):
+        self.file.write(json.dumps(row, sort_keys=True) + '\n')
+
+    def close(self):
+        self.file.close()
+
+
+class CSVWriter(object):
+    """Write a CSV file with a header row"""
+
+    extension = 'csv'
+
+    def __init__(self, path, columns):
+        self.file = open(path, 'wb')
+        self.columns = columns
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(columns)
+
+    def write(self, row):
+        values = []
+        for column in self.columns:
+            value = row.get(column)
+            if value is None:
+                value = ''
+            elif isinstance(value, unicode):
+                value = value.encode('utf-8')
+            values.append(value)
+        self.writer.writerow(values)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter(object):
+    """Write a Parquet file, a row group of row_group_size rows at a time
+    (so only that many rows are ever held in memory)"""
+
+    extension = 'parquet'
+
+    def __init__(self, path, columns, row_group_size=10000):
+        if pyarrow is None:
+            raise ImportError, 'pyarrow is needed to export Parquet files'
+        self.path = path
+        self.columns = columns
+        self.row_group_size = row_group_size
+        self.writer = None
+        self.rows = []
+
+    def write(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if not self.rows:
+            return
+
+        # every column is stored as a string, so the schema is the same
+        # for every row group no matter what values are in it
+        data = {}
+        for column in self.columns:
+            data[column] = [None if row.get(column) is None else unicode(row.get(column)) for row in self.rows]
+        table = pyarrow.Table.from_arrays([pyarrow.array(data[column], type=pyarrow.string()) for column in self.columns],
+                                          names=self.columns)
+        if self.writer is None:
+            self.writer = pyarrow.parquet.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+        self.rows = []
+
+    def close(self):
+        self._flush()
+
+        # with no rows there's nothing to have opened the file yet, but it
+        # should still be written, with the columns and no row groups
+        if self.writer is None:
+            schema = pyarrow.schema([pyarrow.field(column, pyarrow.string()) for column in self.columns])
+            self.writer = pyarrow.parquet.ParquetWriter(self.path, schema)
+        self.writer.close()
+
+
+WRITERS = {
+    'ndjson': NDJSONWriter,
+    'csv': CSVWriter,
+    'parquet': ParquetWriter,
+}
+
+
+def export_resource(directory, resource, format='ndjson'):
+    """Export every object of one resource (e.g. 'people') to a file in
+    directory, returning the number of objects written"""
+
+    klass = RESOURCES[resource]
+    writer_class = WRITERS[format]
+    names = columns(klass)
+    path = os.path.join(directory, '%s.%s' % (resource, writer_class.extension))
+
+    # write to a temporary file, so a failed export doesn't leave a
+    # truncated file that looks complete (and remove it if it fails)
+    writer = writer_class(path + '.tmp', names)
+    count = 0
+    try:
+        try:
+            for obj in klass.iter_all():
+                writer.write(flatten(obj))
+                count += 1
+        finally:
+            writer.close()
+    except:
+        if os.path.exists(path + '.tmp'):
+            os.remove(path + '.tmp')
+        raise
+    os.rename(path + '.tmp', path)
+    return count
+
+
+def export(directory, resources=('people', 'companies', 'deals', 'tasks'), format='ndjson', max_workers=4):
+    """Export several resources to files in directory, up to max_workers
+    of them at the same time. Returns the number of objects written for
+    each resource. If any export fails, the first error is raised once
+    the others have finished."""
+
+    if format not in FORMATS:
+        raise KeyError, 'format must be one of %s' % ', '.join(FORMATS)
+    for resource in resources:
+        if resource not in RESOURCES:
+            raise KeyError, '%s is not a resource pyrise can export' % resource
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    results = _run_concurrently(lambda resource: export_resource(directory, resource, format), resources, max_workers)
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+    return dict(zip(resources, results))
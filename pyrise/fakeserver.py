@@ -0,0 +1,663 @@
+"""A stand-in Highrise server that runs locally, for end-to-end and load
+tests that shouldn't go anywhere near a real account.
+
+    >>> from pyrise import *
+    >>> from pyrise.fakeserver import FakeHighrise
+    >>> server = FakeHighrise(latency=0.05, throttle_rate=0.01).start()
+    >>> server.populate(people=1000, deals=200)
+    >>> Highrise.set_server(server.url)
+    >>> len(Person.all())
+    1000
+    >>> server.stop()
+
+It answers the XML endpoints pyrise uses for people, companies, deals,
+tasks, notes, emails, and tags, and keeps everything in memory. Lists are
+paginated with ?n= the way Highrise does it, updates are merged into the
+stored records, and new records get IDs and timestamps. Responses can be
+slowed down, and a fraction of them can be turned into 503s (with a
+Retry-After header) or 500s to see how a client copes with throttling and
+errors.
+
+Run it directly to serve a populated account until it's interrupted:
+
+    $ python -m pyrise.fakeserver --port 8000 --people 1000 --latency 0.05
+"""
+
+import base64
+import BaseHTTPServer
+import copy
+import hashlib
+import optparse
+import random
+import re
+import socket
+import SocketServer
+import threading
+import time
+import urlparse
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+from xml.etree import ElementTree
+
+# the element used for each kind of record
+RESOURCES = {
+    'people': 'person',
+    'companies': 'company',
+    'deals': 'deal',
+    'tasks': 'task',
+    'notes': 'note',
+    'emails': 'email',
+    'tags': 'tag',
+}
+
+# resources whose lists are paginated with ?n= (the rest come back whole)
+PAGINATED = ('people', 'companies', 'deals')
+
+# the things notes, emails, and tags can be attached to, and the
+# subject-type each one uses
+SUBJECTS = {
+    'people': 'Party',
+    'companies': 'Party',
+    'deals': 'Deal',
+    'kases': 'Kase',
+}
+
+# the kinds of contact details, with the element for each one
+CONTACT_DETAILS = {
+    'email-addresses': 'email-address',
+    'phone-numbers': 'phone-number',
+    'addresses': 'address',
+    'web-addresses': 'web-address',
+    'instant-messengers': 'instant-messenger',
+    'twitter-accounts': 'twitter-account',
+}
+
+# search criteria that live in contact data, and where to find them
+CRITERIA = {
+    'email': 'contact-data/email-addresses/email-address/address',
+    'phone': 'contact-data/phone-numbers/phone-number/number',
+    'city': 'contact-data/addresses/address/city',
+    'state': 'contact-data/addresses/address/state',
+    'zip': 'contact-data/addresses/address/zip',
+    'country': 'contact-data/addresses/address/country',
+}
+
+FIRST_NAMES = ('Inkbert', 'Joe', 'Marge', 'Dale', 'Prudence', 'Wendell', 'Ophelia', 'Rutger', 'Zoe', 'Amos')
+LAST_NAMES = ('McSquibbles', 'Schmoe', 'Underdog', 'Okafor', 'Lindqvist', 'Nakamura', 'Pereira', 'Smith')
+TITLES = ('Chief Sea Squid', 'Manager', 'VP of Sales', 'Account Executive', 'Founder')
+CITIES = (('Austin', 'TX'), ('Chicago', 'IL'), ('Portland', 'OR'), ('Boston', 'MA'))
+
+
+def _timestamp(value=None):
+    """Format a UTC datetime (now, by default) the way Highrise does"""
+
+    return (value or datetime.utcnow()).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _element(tag, text=None, type=None):
+    element = ElementTree.Element(tag)
+    if type is not None:
+        element.set('type', type)
+    if text is not None:
+        element.text = unicode(text)
+    return element
+
+
+def _set(record, tag, text, type=None):
+    """Set the text of one of a record's fields, adding it if it's missing"""
+
+    element = record.find(tag)
+    if element is None:
+        element = _element(tag, type=type)
+        record.append(element)
+    element.text = unicode(text)
+
+
+class FakeHighrise(object):
+    """A local Highrise server with its data held in memory. Call start()
+    to serve it on a background thread, and point pyrise at its url.
+
+    latency is how long each response is held back, in seconds: either a
+    number or a (low, high) range to pick from at random. throttle_rate
+    and error_rate are the fractions of requests that get a 503 (with a
+    Retry-After of retry_after seconds) or a 500 instead of an answer. If
+    token is given, requests have to authenticate with it."""
+
+    # how many notes or emails, and search results, come back per page
+    # (lists of people, companies, and deals have page_size per page)
+    MESSAGE_PAGE_SIZE = 25
+    SEARCH_PAGE_SIZE = 25
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0, throttle_rate=0, error_rate=0, retry_after=1,
+                 page_size=500, token=None, seed=None, log_size=10000):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.page_size = page_size
+        self.token = token
+        self.log = deque(maxlen=log_size)
+        self.request_count = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._failures = deque()
+        self._server = None
+        self._thread = None
+        self.reset()
+
+    def reset(self):
+        """Throw away all the data and the request log"""
+
+        with self._lock:
+            self._records = dict((resource, OrderedDict()) for resource in RESOURCES)
+            self._taggings = {}
+            self._next_id = 1
+            self._failures.clear()
+            self.log.clear()
+            self.request_count = 0
+
+    @property
+    def url(self):
+        """The URL to pass to Highrise.set_server"""
+
+        return 'http://%s:%d' % (self.host, self.port)
+
+    def start(self):
+        """Start serving requests on a background thread"""
+
+        self._server = _Server((self.host, self.port), _Handler)
+        self._server.fake = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving requests"""
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+
+            # hang up on clients that are keeping connections open
+            for connection in list(self._server.connections):
+                try:
+                    connection.shutdown(socket.SHUT_RDWR)
+                except socket.error:
+                    pass
+            self._server = self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, type, value, traceback):
+        self.stop()
+
+    def fail_next(self, status=503, count=1):
+        """Answer the next count requests with an error status, whatever
+        they are (503s come with a Retry-After header)"""
+
+        with self._lock:
+            self._failures.extend([status] * count)
+
+    def add(self, resource, xml):
+        """Store a record (XML as a string or an Element) as though it had
+        been created through the API, returning its new ID"""
+
+        if not isinstance(xml, ElementTree.Element):
+            xml = ElementTree.fromstring(xml)
+        with self._lock:
+            return int(self._create(resource, xml).findtext('id'))
+
+    def get(self, resource, id):
+        """Return a copy of a stored record as an Element, or None"""
+
+        with self._lock:
+            record = self._records[resource].get(int(id))
+            return copy.deepcopy(record) if record is not None else None
+
+    def count(self, resource):
+        """Return the number of records of a resource (e.g. 'people')"""
+
+        with self._lock:
+            return len(self._records[resource])
+
+    def populate(self, people=0, companies=0, deals=0, tasks=0):
+        """Fill the account with made-up records, with plenty of contact
+        data on the parties and people and companies involved in deals"""
+
+        rng = self._random
+        company_ids = []
+        for i in range(companies):
+            company = ElementTree.Element('company')
+            company.append(_element('name', 'Company %d' % rng.randint(1, 100000)))
+            company.append(_element('background', 'Makes squid-related products'))
+            company.append(self._contact_data(rng))
+            company_ids.append(self.add('companies', company))
+
+        person_ids = []
+        for i in range(people):
+            person = ElementTree.Element('person')
+            person.append(_element('first-name', rng.choice(FIRST_NAMES)))
+            person.append(_element('last-name', rng.choice(LAST_NAMES)))
+            person.append(_element('title', rng.choice(TITLES)))
+            person.append(_element('background', 'Met at the %d conference. Likes squid & chips.' % rng.randint(2000, 2011)))
+            if company_ids:
+                person.append(_element('company-id', rng.choice(company_ids), 'integer'))
+            person.append(self._contact_data(rng))
+            person_ids.append(self.add('people', person))
+
+        for i in range(deals):
+            deal = ElementTree.Element('deal')
+            deal.append(_element('name', 'Deal %d' % rng.randint(1, 100000)))
+            deal.append(_element('background', 'Renewal for %d seats' % rng.randint(1, 500)))
+            deal.append(_element('status', rng.choice(('pending', 'won', 'lost'))))
+            deal.append(_element('price', rng.randint(100, 100000), 'integer'))
+            deal.append(_element('price-type', rng.choice(('fixed', 'hour', 'month', 'year'))))
+            deal.append(_element('currency', 'USD'))
+            if person_ids:
+                deal.append(_element('party-id', rng.choice(person_ids), 'integer'))
+            self.add('deals', deal)
+
+        for i in range(tasks):
+            task = ElementTree.Element('task')
+            task.append(_element('body', 'Call back about the squid'))
+            task.append(_element('frame', 'specific'))
+            task.append(_element('due-at', _timestamp(datetime.utcnow() + timedelta(days=rng.randint(1, 60))), 'datetime'))
+            if person_ids:
+                task.append(_element('subject-id', rng.choice(person_ids), 'integer'))
+                task.append(_element('subject-type', 'Party'))
+            self.add('tasks', task)
+
+    def _contact_data(self, rng):
+        """Make up the contact data for a party"""
+
+        contact_data = ElementTree.Element('contact-data')
+        emails = ElementTree.SubElement(contact_data, 'email-addresses', type='array')
+        for location in ('Work', 'Home'):
+            email = ElementTree.SubElement(emails, 'email-address')
+            email.append(_element('address', 'squid%d@example.com' % rng.randint(1, 10 ** 6)))
+            email.append(_element('location', location))
+        phones = ElementTree.SubElement(contact_data, 'phone-numbers', type='array')
+        for location in ('Work', 'Mobile'):
+            phone = ElementTree.SubElement(phones, 'phone-number')
+            phone.append(_element('number', '512-555-%04d' % rng.randint(0, 9999)))
+            phone.append(_element('location', location))
+        addresses = ElementTree.SubElement(contact_data, 'addresses', type='array')
+        city, state = rng.choice(CITIES)
+        address = ElementTree.SubElement(addresses, 'address')
+        for tag, text in (('street', '%d Main St.' % rng.randint(1, 9999)), ('city', city), ('state', state),
+                          ('zip', '%05d' % rng.randint(10000, 99999)), ('country', 'United States'),
+                          ('location', 'Work')):
+            address.append(_element(tag, text))
+        return contact_data
+
+    def handle(self, method, path, body='', headers={}):
+        """Answer a request, returning the status, the response body, and
+        a list of extra headers. This is what the HTTP server calls, but
+        it can be called directly too."""
+
+        started = time.time()
+        status, content, extra = self._answer(method, path, body, headers)
+
+        # hold the response back for as long as we've been asked to
+        latency = self.latency
+        if isinstance(latency, (tuple, list)):
+            latency = self._random.uniform(*latency)
+        delay = latency - (time.time() - started)
+        if delay > 0:
+            time.sleep(delay)
+
+        with self._lock:
+            self.request_count += 1
+            self.log.append((method, path, status))
+        return status, content, extra
+
+    def _answer(self, method, path, body, headers):
+        if self.token is not None:
+            expected = 'Basic %s' % base64.b64encode('%s:X' % self.token)
+            if headers.get('authorization') != expected:
+                return 401, 'HTTP Basic: Access denied.\n', [('WWW-Authenticate', 'Basic realm="Application"')]
+
+        # errors we've been asked to send, or that turn up by chance
+        with self._lock:
+            forced = self._failures.popleft() if self._failures else None
+        if forced is None:
+            if self.throttle_rate and self._random.random() < self.throttle_rate:
+                forced = 503
+            elif self.error_rate and self._random.random() < self.error_rate:
+                forced = 500
+        if forced == 503:
+            return 503, 'Rate limit exceeded', [('Retry-After', str(self.retry_after))]
+        elif forced is not None:
+            return forced, 'Something went wrong', []
+
+        url = urlparse.urlparse(path)
+        query = dict((key, values[-1]) for key, values in urlparse.parse_qs(url.query).iteritems())
+        for route_method, pattern, name in ROUTES:
+            if route_method != method:
+                continue
+            match = pattern.match(url.path)
+            if match is None:
+                continue
+            try:
+                if method in ('POST', 'PUT'):
+                    xml = ElementTree.fromstring(body)
+                    with self._lock:
+                        result = getattr(self, name)(xml, *match.groups())
+                else:
+                    with self._lock:
+                        result = getattr(self, name)(query, *match.groups())
+            except (SyntaxError, ValueError, KeyError):
+                return 422, '<errors><error>That request could not be understood</error></errors>', []
+            if result is None:
+                return 404, 'Not found', []
+            status, content = result
+            break
+        else:
+            return 404, 'Not found', []
+
+        # let clients revalidate what they've already seen
+        extra = []
+        if method == 'GET' and status == 200:
+            etag = '"%s"' % hashlib.md5(content).hexdigest()
+            if headers.get('if-none-match') == etag:
+                return 304, '', [('ETag', etag)]
+            extra.append(('ETag', etag))
+        return status, content, extra
+
+    # the handlers for each route, which are called with the lock held
+
+    def _list(self, query, resource):
+        records = self._records[resource].values()
+        if 'tag_id' in query:
+            tag_id = int(query['tag_id'])
+            records = [record for record in records
+                       if tag_id in self._taggings.get((resource, int(record.findtext('id'))), ())]
+        if 'since' in query:
+            since = datetime.strptime(query['since'], '%Y%m%d%H%M%S')
+            records = [record for record in records if record.findtext('updated-at') >= _timestamp(since)]
+        if 'title' in query:
+            records = [record for record in records if record.findtext('title') == query['title']]
+        return self._page(resource, records, query, resource in PAGINATED and self.page_size)
+
+    def _search(self, query, resource):
+        if 'term' in query:
+            term = query['term'].lower()
+            records = [record for record in self._records[resource].itervalues() if term in self._names(record)]
+        else:
+            records = self._records[resource].values()
+            for key, value in query.iteritems():
+                match = re.match(r'^criteria\[(\w+)\]$', key)
+                if match is None:
+                    continue
+                where = CRITERIA.get(match.group(1), match.group(1).replace('_', '-'))
+                value = value.lower()
+                records = [record for record in records
+                           if any(value in (element.text or '').lower() for element in record.findall(where))]
+        return self._page(resource, records, query, self.SEARCH_PAGE_SIZE)
+
+    def _names(self, record):
+        """The text a search term is matched against"""
+
+        parts = [record.findtext(tag) or '' for tag in ('first-name', 'last-name', 'name')]
+        parts += [element.text or '' for element in record.findall(CRITERIA['email'])]
+        return ' '.join(parts).lower()
+
+    def _company_people(self, query, company_id):
+        if int(company_id) not in self._records['companies']:
+            return None
+        records = [record for record in self._records['people'].itervalues()
+                   if record.findtext('company-id') == company_id]
+        return self._page('people', records, query, None)
+
+    def _messages(self, query, subject, subject_id, resource):
+        if subject != 'kases' and int(subject_id) not in self._records[subject]:
+            return None
+        records = [record for record in self._records[resource].itervalues()
+                   if record.findtext('subject-id') == subject_id and
+                   record.findtext('subject-type') == SUBJECTS[subject]]
+        return self._page(resource, records, query, self.MESSAGE_PAGE_SIZE)
+
+    def _page(self, resource, records, query, page_size):
+        """Render a list of records, just the page asked for if page_size
+        is given"""
+
+        if page_size:
+            offset = int(query.get('n', 0))
+            records = records[offset:offset + page_size]
+        return 200, '<?xml version="1.0" encoding="UTF-8"?>\n<%s type="array">%s</%s>' % (
+            resource, ''.join(ElementTree.tostring(record) for record in records), resource)
+
+    def _show(self, query, resource, id):
+        record = self._records[resource].get(int(id))
+        if record is None:
+            return None
+        return 200, ElementTree.tostring(record)
+
+    def _subject_tags(self, query, subject, subject_id):
+        if subject != 'kases' and int(subject_id) not in self._records[subject]:
+            return None
+        tags = self._records['tags']
+        records = [tags[tag_id] for tag_id in self._taggings.get((subject, int(subject_id)), ()) if tag_id in tags]
+        return self._page('tags', records, query, None)
+
+    def _create(self, resource, xml):
+        """Store a new record, giving it and its contact details IDs"""
+
+        if resource not in RESOURCES:
+            raise KeyError, resource
+        id = self._new_id()
+        for element in xml.findall('id'):
+            xml.remove(element)
+        xml.insert(0, _element('id', id, 'integer'))
+        now = _timestamp()
+        _set(xml, 'created-at', now, 'datetime')
+        _set(xml, 'updated-at', now, 'datetime')
+        if resource in ('people', 'companies'):
+            _set(xml, 'type', 'Person' if resource == 'people' else 'Company')
+        contact_data = xml.find('contact-data')
+        if contact_data is not None:
+            xml.remove(contact_data)
+            self._merge_contact_data(ElementTree.SubElement(xml, 'contact-data'), contact_data)
+        self._records[resource][id] = xml
+        return xml
+
+    def _new_id(self):
+        id = self._next_id
+        self._next_id += 1
+        return id
+
+    def _post(self, xml, resource):
+        if resource == 'tags':
+            return None
+        return 201, ElementTree.tostring(self._create(resource, xml))
+
+    def _update(self, xml, resource, id):
+        """Merge the fields sent into a record. Contact details with IDs
+        replace the ones they match, and those without are added."""
+
+        record = self._records[resource].get(int(id))
+        if record is None:
+            return None
+        for field in xml:
+            if field.tag in ('id', 'created-at', 'updated-at'):
+                continue
+            if field.tag == 'contact-data':
+                existing = record.find('contact-data')
+                if existing is None:
+                    existing = ElementTree.SubElement(record, 'contact-data')
+                self._merge_contact_data(existing, field)
+                continue
+            existing = record.find(field.tag)
+            if existing is not None:
+                record.remove(existing)
+            record.append(field)
+        _set(record, 'updated-at', _timestamp(), 'datetime')
+        return 200, ''
+
+    def _merge_contact_data(self, contact_data, changes):
+        for kind in list(changes):
+            if kind.tag not in CONTACT_DETAILS:
+                continue
+            details = contact_data.find(kind.tag)
+            if details is None:
+                details = ElementTree.SubElement(contact_data, kind.tag, type='array')
+            by_id = dict((element.findtext('id'), element) for element in details)
+            for detail in list(kind):
+                existing = by_id.get(detail.findtext('id')) if detail.findtext('id') else None
+                if existing is not None:
+                    for field in detail:
+                        if field.tag != 'id':
+                            _set(existing, field.tag, field.text or '')
+                else:
+                    for element in detail.findall('id'):
+                        detail.remove(element)
+                    detail.insert(0, _element('id', self._new_id(), 'integer'))
+                    details.append(detail)
+
+    def _update_status(self, xml, id):
+        record = self._records['deals'].get(int(id))
+        if record is None:
+            return None
+        _set(record, 'status', xml.findtext('name'))
+        _set(record, 'status-changed-on', datetime.utcnow().strftime('%Y-%m-%d'), 'date')
+        _set(record, 'updated-at', _timestamp(), 'datetime')
+        return 200, ''
+
+    def _add_tag(self, xml, subject, subject_id):
+        if subject != 'kases' and int(subject_id) not in self._records[subject]:
+            return None
+        name = (xml.text if xml.tag == 'name' else xml.findtext('name')) or ''
+        name = name.strip()
+        if not name:
+            raise ValueError, 'a tag needs a name'
+        for tag in self._records['tags'].itervalues():
+            if tag.findtext('name') == name:
+                break
+        else:
+            id = self._new_id()
+            tag = ElementTree.Element('tag')
+            tag.append(_element('id', id, 'integer'))
+            tag.append(_element('name', name))
+            self._records['tags'][id] = tag
+        taggings = self._taggings.setdefault((subject, int(subject_id)), [])
+        tag_id = int(tag.findtext('id'))
+        if tag_id not in taggings:
+            taggings.append(tag_id)
+        return 201, ElementTree.tostring(tag)
+
+    def _remove_tag(self, query, subject, subject_id, tag_id):
+        taggings = self._taggings.get((subject, int(subject_id)), [])
+        if int(tag_id) not in taggings:
+            return None
+        taggings.remove(int(tag_id))
+        return 200, ''
+
+    def _delete(self, query, resource, id):
+        if self._records[resource].pop(int(id), None) is None:
+            return None
+        self._taggings.pop((resource, int(id)), None)
+        return 200, ''
+
+
+_resources = '|'.join(RESOURCES)
+_subjects = '|'.join(SUBJECTS)
+
+# each request method and path the server understands, with the method
+# that answers it (the first match wins)
+ROUTES = [(method, re.compile(pattern), name) for method, pattern, name in (
+    ('GET', r'^/(people|companies)/search\.xml$', '_search'),
+    ('GET', r'^/companies/(\d+)/people\.xml$', '_company_people'),
+    ('GET', r'^/(%s)/(\d+)/tags\.xml$' % _subjects, '_subject_tags'),
+    ('POST', r'^/(%s)/(\d+)/tags\.xml$' % _subjects, '_add_tag'),
+    ('DELETE', r'^/(%s)/(\d+)/tags/(\d+)\.xml$' % _subjects, '_remove_tag'),
+    ('GET', r'^/(%s)/(\d+)/(notes|emails)\.xml$' % _subjects, '_messages'),
+    ('PUT', r'^/deals/(\d+)/status\.xml$', '_update_status'),
+    ('GET', r'^/(%s)\.xml$' % _resources, '_list'),
+    ('POST', r'^/(%s)\.xml$' % _resources, '_post'),
+    ('GET', r'^/(%s)/(\d+)\.xml$' % _resources, '_show'),
+    ('PUT', r'^/(%s)/(\d+)\.xml$' % _resources, '_update'),
+    ('DELETE', r'^/(%s)/(\d+)\.xml$' % _resources, '_delete'),
+)]
+
+
+class _Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Pass each request on to the FakeHighrise, keeping connections
+    alive between requests like Highrise does"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FakeHighrise'
+
+    def setup(self):
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+        self.server.connections.add(self.connection)
+
+    def finish(self):
+        self.server.connections.discard(self.connection)
+        BaseHTTPServer.BaseHTTPRequestHandler.finish(self)
+
+    def respond(self):
+        length = int(self.headers.getheader('content-length') or 0)
+        body = self.rfile.read(length) if length else ''
+        headers = dict((name.lower(), value) for name, value in self.headers.items())
+        status, content, extra = self.server.fake.handle(self.command, self.path, body, headers)
+        if isinstance(content, unicode):
+            content = content.encode('utf-8')
+
+        self.send_response(status)
+        for name, value in extra:
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/xml; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_DELETE = respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Server(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def __init__(self, address, handler):
+        BaseHTTPServer.HTTPServer.__init__(self, address, handler)
+        self.connections = set()
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options]')
+    parser.add_option('--host', default='127.0.0.1', help='the address to listen on [%default]')
+    parser.add_option('--port', type='int', default=8000, help='the port to listen on [%default]')
+    parser.add_option('--people', type='int', default=1000, help='how many people to make up [%default]')
+    parser.add_option('--companies', type='int', default=100, help='how many companies to make up [%default]')
+    parser.add_option('--deals', type='int', default=200, help='how many deals to make up [%default]')
+    parser.add_option('--tasks', type='int', default=100, help='how many tasks to make up [%default]')
+    parser.add_option('--latency', type='float', default=0, help='seconds to hold each response back [%default]')
+    parser.add_option('--throttle-rate', type='float', default=0, help='the fraction of requests to answer with 503 [%default]')
+    parser.add_option('--error-rate', type='float', default=0, help='the fraction of requests to answer with 500 [%default]')
+    parser.add_option('--token', help='the API token requests have to use (any will do if not given)')
+    options, args = parser.parse_args()
+
+    server = FakeHighrise(options.host, options.port, latency=options.latency, throttle_rate=options.throttle_rate,
+                          error_rate=options.error_rate, token=options.token)
+    server.populate(people=options.people, companies=options.companies, deals=options.deals, tasks=options.tasks)
+    server.start()
+    print 'Serving a fake Highrise account at %s (press Ctrl-C to stop)' % server.url
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+"""A local SQLite mirror of Highrise data, for fast offline queries.
+
+    >>> from pyrise import *
+    >>> from pyrise.mirror import Mirror
+    >>> from pyrise.sync import SyncEngine
+    >>> mirror = Mirror('highrise.db')
+    >>> SyncEngine(mirror, state_path='highrise-sync.json', tags=True).sync()
+    >>> Highrise.set_mirror(mirror)
+    >>> people = Person.filter(company_id=1234, source='local')
+    >>> deal = Deal.get(12345, source='local')
+
+People, companies, deals, and tasks are stored as XML alongside indexed
+columns for the things you'd usually look them up by: name, email address,
+phone number, company, tag, owner, deal status, and task due date.
+"""
+
+import re
+import sqlite3
+import threading
+
+from pyrise import ElementTree, NotFound, _format_datetime, _parse_datetime
+from pyrise.sync import Store
+
+# the resource each class is stored under
+RESOURCES = {
+    'Person': 'people',
+    'Company': 'companies',
+    'Deal': 'deals',
+    'Task': 'tasks',
+}
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS objects (
+    resource TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    name TEXT COLLATE NOCASE,
+    title TEXT COLLATE NOCASE,
+    company_id INTEGER,
+    owner_id INTEGER,
+    status TEXT,
+    due_at TEXT,
+    updated_at TEXT,
+    xml TEXT NOT NULL,
+    PRIMARY KEY (resource, id)
+);
+CREATE INDEX IF NOT EXISTS objects_name ON objects (resource, name);
+CREATE INDEX IF NOT EXISTS objects_company_id ON objects (resource, company_id);
+CREATE INDEX IF NOT EXISTS objects_owner_id ON objects (resource, owner_id);
+CREATE INDEX IF NOT EXISTS objects_status ON objects (resource, status);
+CREATE INDEX IF NOT EXISTS objects_due_at ON objects (resource, due_at);
+CREATE INDEX IF NOT EXISTS objects_updated_at ON objects (resource, updated_at);
+
+CREATE TABLE IF NOT EXISTS emails (
+    resource TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    address TEXT COLLATE NOCASE
+);
+CREATE INDEX IF NOT EXISTS emails_address ON emails (address);
+CREATE INDEX IF NOT EXISTS emails_object ON emails (resource, id);
+
+CREATE TABLE IF NOT EXISTS phones (
+    resource TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    number TEXT
+);
+CREATE INDEX IF NOT EXISTS phones_number ON phones (number);
+CREATE INDEX IF NOT EXISTS phones_object ON phones (resource, id);
+
+CREATE TABLE IF NOT EXISTS tags (
+    resource TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    tag_id INTEGER,
+    name TEXT COLLATE NOCASE
+);
+CREATE INDEX IF NOT EXISTS tags_tag_id ON tags (tag_id);
+CREATE INDEX IF NOT EXISTS tags_name ON tags (name);
+CREATE INDEX IF NOT EXISTS tags_object ON tags (resource, id);
+'''
+
+
+class Mirror(Store):
+    """A SQLite database holding a copy of Highrise data. It can be kept
+    up to date with a pyrise.sync.SyncEngine, and queried directly or
+    through get/filter with source='local' (see Highrise.set_mirror)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _resource(self, klass):
+        """Get the resource name for a class"""
+
+        try:
+            return RESOURCES[klass.__name__]
+        except KeyError:
+            raise KeyError, '%s objects are not stored in the local mirror' % klass.__name__
+
+    def upsert(self, resource, obj):
+        """Add or replace an object in the mirror"""
+
+        # work out the values of the indexed columns
+        if resource == 'people':
+            name = ('%s %s' % (obj.first_name or '', obj.last_name or '')).strip()
+        elif resource == 'tasks':
+            name = obj.body
+        else:
+            name = obj.name
+        row = (
+            resource,
+            obj.id,
+            name,
+            getattr(obj, 'title', None),
+            getattr(obj, 'company_id', None),
+            obj.owner_id,
+            getattr(obj, 'status', None),
+            _timestamp(getattr(obj, 'due_at', None)),
+            _timestamp(obj.updated_at),
+            ElementTree.tostring(obj.to_xml()),
+        )
+
+        contact_data = getattr(obj, 'contact_data', None)
+        emails = phones = ()
+        if contact_data is not None:
+            emails = [(resource, obj.id, e.address) for e in contact_data.email_addresses]
+            phones = [(resource, obj.id, _digits(p.number)) for p in contact_data.phone_numbers]
+
+        with self._lock:
+            with self._db:
+                self._db.execute('INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', row)
+                self._db.execute('DELETE FROM emails WHERE resource = ? AND id = ?', (resource, obj.id))
+                self._db.execute('DELETE FROM phones WHERE resource = ? AND id = ?', (resource, obj.id))
+                self._db.executemany('INSERT INTO emails VALUES (?, ?, ?)', emails)
+                self._db.executemany('INSERT INTO phones VALUES (?, ?, ?)', phones)
+
+    def delete(self, resource, id):
+        """Remove an object (and its contact details and tags)"""
+
+        with self._lock:
+            with self._db:
+                for table in ('objects', 'emails', 'phones', 'tags'):
+                    self._db.execute('DELETE FROM %s WHERE resource = ? AND id = ?' % table, (resource, id))
+
+    def set_tags(self, resource, id, tags):
+        """Replace the tags stored for an object"""
+
+        with self._lock:
+            with self._db:
+                self._db.execute('DELETE FROM tags WHERE resource = ? AND id = ?', (resource, id))
+                self._db.executemany('INSERT INTO tags VALUES (?, ?, ?, ?)',
+                                     [(resource, id, tag.id, tag.name) for tag in tags])
+
+    def ids(self, resource):
+        with self._lock:
+            return set(row[0] for row in self._db.execute('SELECT id FROM objects WHERE resource = ?', (resource,)))
+
+    def updated_at(self, resource, id):
+        with self._lock:
+            row = self._db.execute('SELECT updated_at FROM objects WHERE resource = ? AND id = ?', (resource, id)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return _parse_datetime(row[0])
+
+    def get(self, klass, id):
+        """Load a single object of the given class, raising NotFound if
+        it isn't in the mirror"""
+
+        resource = self._resource(klass)
+        with self._lock:
+            row = self._db.execute('SELECT xml FROM objects WHERE resource = ? AND id = ?', (resource, int(id))).fetchone()
+        if row is None:
+            raise NotFound, '%s %s is not in the local mirror' % (klass.__name__, id)
+        return klass.from_xml(ElementTree.fromstring(row[0].encode('utf-8')))
+
+    def filter(self, klass, **kwargs):
+        """Iterate over the objects of the given class matching all of the
+        criteria given:
+
+        term         a word in the name, or part of an email address
+        name         the exact name (first and last name for people)
+        title        part of a person's job title
+        email        an exact email address
+        phone        a phone number (only the digits are compared)
+        tag_id, tag  the id or name of a tag
+        since        updated at or after this datetime
+        company_id, owner_id, status
+        due_before, due_after  for tasks
+        """
+
+        resource = self._resource(klass)
+        conditions = ['resource = ?']
+        params = [resource]
+        for key, value in kwargs.iteritems():
+            if key == 'term':
+                conditions.append('(name LIKE ? OR name LIKE ? OR id IN '
+                                  '(SELECT id FROM emails WHERE resource = ? AND address LIKE ?))')
+                params += [value + '%', '% ' + value + '%', resource, '%' + value + '%']
+            elif key in ('name', 'company_id', 'owner_id', 'status'):
+                conditions.append('%s = ?' % key)
+                params.append(value)
+            elif key == 'title':
+                conditions.append('title LIKE ?')
+                params.append('%' + value + '%')
+            elif key == 'email':
+                conditions.append('id IN (SELECT id FROM emails WHERE resource = ? AND address = ?)')
+                params += [resource, value]
+            elif key == 'phone':
+                conditions.append('id IN (SELECT id FROM phones WHERE resource = ? AND number = ?)')
+                params += [resource, _digits(value)]
+            elif key in ('tag_id', 'tag'):
+                column = 'tag_id' if key == 'tag_id' else 'name'
+                conditions.append('id IN (SELECT id FROM tags WHERE resource = ? AND %s = ?)' % column)
+                params += [resource, value]
+            elif key == 'since':
+                conditions.append('updated_at >= ?')
+                params.append(_timestamp(value))
+            elif key == 'due_before':
+                conditions.append('due_at < ?')
+                params.append(_timestamp(value))
+            elif key == 'due_after':
+                conditions.append('due_at >= ?')
+                params.append(_timestamp(value))
+            else:
+                raise KeyError, '"%s" can not be used to filter the local mirror' % key
+
+        query = 'SELECT xml FROM objects WHERE %s ORDER BY id' % ' AND '.join(conditions)
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        for row in rows:
+            yield klass.from_xml(ElementTree.fromstring(row[0].encode('utf-8')))
+
+    def tags(self, klass, subject, subject_id):
+        """Get the tags stored for a person, company, or deal as objects
+        of the given (Tag) class"""
+
+        with self._lock:
+            rows = self._db.execute('SELECT tag_id, name FROM tags WHERE resource = ? AND id = ? ORDER BY name',
+                                    (subject, int(subject_id))).fetchall()
+        tags = []
+        for tag_id, name in rows:
+            tag = klass()
+            tag.id = tag_id
+            tag.name = name
+            tags.append(tag)
+        return tags
+
+
+def _timestamp(value):
+    """Store datetimes as Highrise timestamps, which sort correctly"""
+
+    if value is None:
+        return None
+    return _format_datetime(value)
+
+
+def _digits(number):
+    """Strip everything but the digits from a phone number"""
+
+    return re.sub(r'\D', '', number or '')
@@ -0,0 +1,217 @@
+"""Keep a local copy of Highrise data up to date incrementally.
+
+    >>> from pyrise.sync import SyncEngine, MemoryStore
+    >>> store = MemoryStore()
+    >>> engine = SyncEngine(store, state_path='highrise-sync.json')
+    >>> engine.sync()
+    {'people': {'updated': 12, 'deleted': 0}, 'companies': {'updated': 3, 'deleted': 1}}
+
+People and companies are synced with Highrise's `since` filter, so each run
+only downloads what has changed since the last one. Highrise doesn't report
+deletions that way, so every `reconcile_every` runs the full list of IDs is
+compared against the local store as well. Deals and tasks can't be filtered
+by date, so they are read in full each time, but only the records that have
+actually changed are applied to the store.
+"""
+
+import json
+import os
+from datetime import timedelta
+
+from pyrise import Person, Company, Deal, Task, Tag, _format_datetime, _parse_datetime
+
+
+class Store(object):
+    """Base class for the local stores a SyncEngine applies changes to.
+    Subclasses need to implement all of these methods."""
+
+    def upsert(self, resource, obj):
+        """Add or replace an object (e.g. a Person for 'people')"""
+
+        raise NotImplementedError
+
+    def delete(self, resource, id):
+        """Remove the object with this id, if there is one"""
+
+        raise NotImplementedError
+
+    def ids(self, resource):
+        """Return the set of ids stored for a resource"""
+
+        raise NotImplementedError
+
+    def updated_at(self, resource, id):
+        """Return the updated_at value of a stored object, or None"""
+
+        raise NotImplementedError
+
+    def set_tags(self, resource, id, tags):
+        """Replace the tags stored for an object. Only needed for stores
+        used with SyncEngine(tags=True)."""
+
+        raise NotImplementedError
+
+
+class MemoryStore(Store):
+    """A store that keeps everything in dictionaries in memory"""
+
+    def __init__(self):
+        self.objects = {}
+        self.tags = {}
+
+    def _objects(self, resource):
+        return self.objects.setdefault(resource, {})
+
+    def upsert(self, resource, obj):
+        self._objects(resource)[obj.id] = obj
+
+    def delete(self, resource, id):
+        self._objects(resource).pop(id, None)
+
+    def ids(self, resource):
+        return set(self._objects(resource))
+
+    def updated_at(self, resource, id):
+        obj = self._objects(resource).get(id)
+        if obj is None:
+            return None
+        return obj.updated_at
+
+    def set_tags(self, resource, id, tags):
+        self.tags.setdefault(resource, {})[id] = tags
+
+
+class SyncEngine(object):
+    """Pull changes from Highrise into a local store.
+
+    The high-water mark for each resource (the latest updated_at seen) is
+    saved to the JSON file at state_path, if given, so a new process picks
+    up where the last one left off. It is only advanced once a resource
+    has been synced successfully, so an interrupted run is simply
+    repeated.
+
+    With tags=True, the tags of each updated person, company, and deal
+    are fetched as well (one extra request per updated object) and
+    passed to the store's set_tags method."""
+
+    # resources that support the since filter, and those that have to be
+    # read in full every time
+    INCREMENTAL = {
+        'people': Person,
+        'companies': Company,
+    }
+    FULL = {
+        'deals': Deal,
+        'tasks': Task,
+    }
+
+    def __init__(self, store, state_path=None, resources=('people', 'companies', 'deals', 'tasks'),
+                 reconcile_every=24, overlap=60, tags=False):
+        for resource in resources:
+            if resource not in self.INCREMENTAL and resource not in self.FULL:
+                raise KeyError, '%s is not a resource pyrise can sync' % resource
+
+        self.store = store
+        self.state_path = state_path
+        self.resources = resources
+        self.reconcile_every = reconcile_every
+        self.overlap = timedelta(seconds=overlap)
+        self.tags = tags
+        self.state = self._load_state()
+
+    def _load_state(self):
+        """Load the saved high-water marks, if there are any"""
+
+        if self.state_path and os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                return json.load(f)
+        return {}
+
+    def _save_state(self):
+        """Save the high-water marks, replacing the old file atomically"""
+
+        if not self.state_path:
+            return
+        temp = self.state_path + '.tmp'
+        with open(temp, 'w') as f:
+            json.dump(self.state, f, indent=2, sort_keys=True)
+        os.rename(temp, self.state_path)
+
+    def sync(self, reconcile=None):
+        """Sync every resource, returning a dictionary of how many objects
+        were updated and deleted for each one. Pass reconcile=True to
+        check for deleted people and companies on this run regardless of
+        reconcile_every."""
+
+        return dict((resource, self.sync_resource(resource, reconcile)) for resource in self.resources)
+
+    def sync_resource(self, resource, reconcile=None):
+        """Sync a single resource (e.g. 'people')"""
+
+        state = self.state.setdefault(resource, {'since': None, 'runs': 0})
+        since = state['since'] and _parse_datetime(state['since'])
+
+        # read in full if this resource can't be filtered by date, if we've
+        # never synced it before, or if it's time to look for deletions
+        if reconcile is None:
+            reconcile = self.reconcile_every and state['runs'] % self.reconcile_every == self.reconcile_every - 1
+        if resource in self.FULL or since is None or reconcile:
+            stats, latest = self._sync_full(resource, since)
+        else:
+            stats, latest = self._sync_since(resource, since)
+
+        if latest is not None and (since is None or latest > since):
+            state['since'] = _format_datetime(latest)
+        state['runs'] += 1
+        self._save_state()
+        return stats
+
+    def _sync_since(self, resource, since):
+        """Apply just the objects that have changed since a point in time"""
+
+        stats = {'updated': 0, 'deleted': 0}
+        latest = None
+        for obj in self.INCREMENTAL[resource].iter_filter(since=since - self.overlap):
+            self._apply(resource, obj)
+            stats['updated'] += 1
+            latest = _later(latest, obj.updated_at)
+
+        return stats, latest
+
+    def _sync_full(self, resource, since):
+        """Read every object, applying the ones that have changed and
+        deleting the ones that aren't in Highrise anymore"""
+
+        klass = self.INCREMENTAL.get(resource) or self.FULL[resource]
+        stats = {'updated': 0, 'deleted': 0}
+        latest = None
+        local = self.store.ids(resource)
+        seen = set()
+        for obj in klass.iter_all():
+            seen.add(obj.id)
+            updated_at = obj.updated_at
+            latest = _later(latest, updated_at)
+            if obj.id not in local or updated_at is None or self.store.updated_at(resource, obj.id) != updated_at:
+                self._apply(resource, obj)
+                stats['updated'] += 1
+
+        for id in local - seen:
+            self.store.delete(resource, id)
+            stats['deleted'] += 1
+
+        return stats, latest
+
+    def _apply(self, resource, obj):
+        """Store an updated object, along with its tags if we're syncing them"""
+
+        self.store.upsert(resource, obj)
+        if self.tags and resource != 'tasks':
+            self.store.set_tags(resource, obj.id, Tag.get_by(resource, obj.id))
+
+
+def _later(a, b):
+    """Return the later of two datetimes, either of which could be None"""
+
+    if a is None or (b is not None and b > a):
+        return b
+    return a
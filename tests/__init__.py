@@ -0,0 +1,23 @@
+import unittest
+
+from pyrise import *
+from pyrise.fakeserver import FakeHighrise
+
+
+class FakeServerTestCase(unittest.TestCase):
+    """A test case with a fresh fake Highrise for every test"""
+
+    def setUp(self):
+        self.server = FakeHighrise(retry_after=0).start()
+        Highrise.set_server(self.server.url)
+        Highrise.auth('test')
+
+    def tearDown(self):
+        self.server.stop()
+        Highrise.set_lazy_nested(False)
+        Highrise.set_lazy_timestamps(False)
+
+    def requests(self, method):
+        """The paths of the requests the server got with a method"""
+
+        return [path for logged, path, status in self.server.log if logged == method]
@@ -0,0 +1,30 @@
+from tests import *
+
+
+class AsyncTests(FakeServerTestCase):
+
+    def test_aget(self):
+        id = self.server.add('people', '<person><first-name>Quinn</first-name></person>')
+        self.assertEqual(Person.aget(id).get(5).first_name, 'Quinn')
+
+    def test_aiter_all(self):
+        self.server.populate(people=1200)
+        people = Person.aiter_all(buffer_size=100)
+        ids = [person.id for person in people]
+        self.assertEqual(len(ids), 1200)
+        self.assertEqual(len(set(ids)), 1200)
+        self.assertEqual(list(people), [])
+
+    def test_aiter_all_error(self):
+        self.server.populate(people=600)
+        self.server.fail_next(500)
+        self.assertRaises(UnexpectedResponse, list, Person.aiter_all())
+
+    def test_aiter_all_close(self):
+        self.server.populate(people=1200)
+        people = Person.aiter_all(buffer_size=10)
+        self.assertTrue(isinstance(next(people), Person))
+        people.close()
+        people.result.get(5)
+        self.assertEqual(list(people), [])
+        self.assertTrue(len(self.requests('GET')) < 3)
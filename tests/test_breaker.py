@@ -0,0 +1,41 @@
+import time
+
+from tests import *
+
+
+class CircuitBreakerTests(FakeServerTestCase):
+
+    def setUp(self):
+        FakeServerTestCase.setUp(self)
+        Highrise.set_retries(0)
+        Highrise.set_circuit_breaker(1, cooldown=0.1)
+
+    def tearDown(self):
+        Highrise.set_circuit_breaker(None)
+        Highrise.set_retries(3)
+        FakeServerTestCase.tearDown(self)
+
+    def open_circuit(self):
+        self.server.fail_next(502)
+        self.assertRaises(GatewayConnectionError, Person.get, 1)
+        self.assertRaises(CircuitOpen, Person.get, 1)
+        time.sleep(0.15)
+
+    def test_not_found_trial_closes_circuit(self):
+        id = self.server.add('people', '<person><first-name>Eve</first-name></person>')
+        self.open_circuit()
+        self.assertRaises(NotFound, Person.get, id + 1)
+        self.assertEqual(Person.get(id).first_name, 'Eve')
+
+    def test_throttled_trial_closes_circuit(self):
+        id = self.server.add('people', '<person><first-name>Fay</first-name></person>')
+        self.open_circuit()
+        self.server.fail_next(503)
+        self.assertRaises(ServiceUnavailable, Person.get, id)
+        self.assertEqual(Person.get(id).first_name, 'Fay')
+
+    def test_gateway_failure_trial_keeps_circuit_open(self):
+        self.open_circuit()
+        self.server.fail_next(502)
+        self.assertRaises(GatewayConnectionError, Person.get, 1)
+        self.assertRaises(CircuitOpen, Person.get, 1)
@@ -0,0 +1,52 @@
+import os
+import shutil
+import tempfile
+
+from tests import *
+
+
+def people(*names):
+    return [Person(first_name=name, last_name='Example') for name in names]
+
+
+class BulkCheckpointTests(FakeServerTestCase):
+
+    def setUp(self):
+        FakeServerTestCase.setUp(self)
+        self.directory = tempfile.mkdtemp()
+        self.checkpoint = os.path.join(self.directory, 'import.ckpt')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        FakeServerTestCase.tearDown(self)
+
+    def test_resume_skips_completed(self):
+        first = Person.bulk_save(people('Hal', 'Ida'), checkpoint=self.checkpoint)
+        resumed = Person.bulk_save(people('Hal', 'Ida', 'Jo'), checkpoint=self.checkpoint)
+        self.assertEqual([person.id for person in resumed[:2]], [person.id for person in first])
+        self.assertEqual(self.server.count('people'), 3)
+        self.assertEqual(len(self.requests('POST')), 3)
+
+    def test_retry_failures_in_same_process(self):
+        objs = people('Hal', 'Ida')
+        self.server.fail_next(500)
+        results = Person.bulk_save(objs, max_workers=1, checkpoint=self.checkpoint)
+        self.assertTrue(isinstance(results[0], UnexpectedResponse))
+        saved = objs[1].id
+        results = Person.bulk_save(objs, max_workers=1, checkpoint=self.checkpoint)
+        self.assertEqual(results, objs)
+        self.assertEqual(objs[1].id, saved)
+        self.assertEqual(self.server.count('people'), 2)
+
+    def test_resume_with_reordered_objects(self):
+        Person.bulk_save(people('Hal', 'Ida'), checkpoint=self.checkpoint)
+        self.assertRaises(ValueError, Person.bulk_save, people('Ida', 'Hal'), checkpoint=self.checkpoint)
+        self.assertRaises(ValueError, Person.bulk_save, people('Ida'), checkpoint=self.checkpoint)
+        self.assertEqual(self.server.count('people'), 2)
+
+    def test_resume_with_key(self):
+        key = lambda person: person.first_name
+        Person.bulk_save(people('Hal'), checkpoint=self.checkpoint, key=key)
+        resumed = Person.bulk_save(people('Hal', 'Ida'), checkpoint=self.checkpoint, key=key)
+        self.assertEqual([person.first_name for person in resumed], ['Hal', 'Ida'])
+        self.assertEqual(self.server.count('people'), 2)
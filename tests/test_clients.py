@@ -0,0 +1,81 @@
+import shutil
+import tempfile
+
+from tests import *
+
+
+class ClientTests(FakeServerTestCase):
+    """Two clients for two accounts, with Highrise itself pointed at a
+    third that neither should ever send requests to"""
+
+    def setUp(self):
+        FakeServerTestCase.setUp(self)
+        self.servers, self.clients, self.ids = [], [], []
+        for token, name in (('token-a', 'Ann'), ('token-b', 'Bo')):
+            server = FakeHighrise(token=token).start()
+            id = server.add('people', '<person><first-name>%s</first-name><contact-data><email-addresses type="array">'
+                                      '<email-address><address>%s@example.com</address><location>Work</location>'
+                                      '</email-address></email-addresses></contact-data></person>' % (name, name))
+            server.add('notes', '<note><body>About %s</body><subject-id>%d</subject-id>'
+                                '<subject-type>Party</subject-type></note>' % (name, id))
+            self.servers.append(server)
+            self.clients.append(Highrise(server.url, token))
+            self.ids.append(id)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        for server in self.servers:
+            server.stop()
+        shutil.rmtree(self.directory)
+        FakeServerTestCase.tearDown(self)
+
+    def test_requests_go_through_their_client(self):
+        a, b = self.clients
+        for client, server, id, name in zip(self.clients, self.servers, self.ids, ('Ann', 'Bo')):
+            person = client.Person.get(id)
+            self.assertTrue(person._client is client)
+            self.assertTrue(person.contact_data._client is client)
+            self.assertEqual(person.contact_data.email_addresses[0].address, '%s@example.com' % name)
+
+            person.add_tag('customer')
+            self.assertEqual([tag.name for tag in person.tags], ['customer'])
+            self.assertEqual([note.body for note in person.notes], ['About %s' % name])
+            self.assertTrue(person.notes[0]._client is client)
+
+            person.contact_data.email_addresses[0].address = '%s@example.org' % name
+            person.save()
+            self.assertEqual(server.get('people', id).findtext('contact-data/email-addresses/email-address/address'),
+                             '%s@example.org' % name)
+
+        # every request went to the account it was meant for (each one
+        # needs its own token, so one sent to the wrong account would have
+        # raised AuthorizationRequired)
+        self.assertEqual(list(self.server.log), [])
+        for server in self.servers:
+            self.assertTrue(server.log)
+
+    def test_settings_are_separate(self):
+        a, b = self.clients
+        calls = []
+        a.add_hook('before_request', calls.append)
+        a.set_cache(self.directory)
+        a.set_rate_limit(100)
+
+        self.assertTrue(a._pool is not b._pool and a._pool is not Highrise._pool)
+        for other in (b, Highrise):
+            self.assertEqual(other._cache, None)
+            self.assertEqual(other._limiter, None)
+            self.assertEqual(other._hooks, {})
+
+        b.Person.get(self.ids[1])
+        self.assertEqual(calls, [])
+        a.Person.get(self.ids[0])
+        self.assertEqual([info['path'] for info in calls], ['/people/%s.xml' % self.ids[0]])
+
+    def test_bound_classes(self):
+        a, b = self.clients
+        self.assertTrue(a.Person is a.Person)
+        self.assertTrue(a.Person is not b.Person)
+        self.assertTrue(issubclass(a.Person, Person))
+        self.assertTrue(Person._client is Highrise)
+        self.assertTrue(a._bind(b.Person) is a.Person)
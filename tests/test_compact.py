@@ -0,0 +1,16 @@
+import unittest
+
+from pyrise import *
+
+DEAL = ('<deal><id type="integer">1</id><name>Big deal</name><party><id type="integer">2</id>'
+        '<type>Person</type><first-name>Gil</first-name></party></deal>')
+
+
+class CompactTests(unittest.TestCase):
+
+    def test_party_type_in_to_xml(self):
+        for klass in (Deal, Deal.compact()):
+            deal = klass.from_xml(ElementTree.fromstring(DEAL))
+            xml = deal.to_xml()
+            self.assertEqual(xml.findtext('party/type'), 'Person')
+            self.assertEqual(klass.from_xml(xml).party.first_name, 'Gil')
@@ -0,0 +1,31 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from tests import *
+from pyrise import export
+
+
+class ExportTests(FakeServerTestCase):
+
+    def setUp(self):
+        FakeServerTestCase.setUp(self)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        FakeServerTestCase.tearDown(self)
+
+    @unittest.skipIf(export.pyarrow is None, 'pyarrow is not installed')
+    def test_empty_parquet_export(self):
+        self.assertEqual(export.export_resource(self.directory, 'people', 'parquet'), 0)
+        table = export.pyarrow.parquet.read_table(os.path.join(self.directory, 'people.parquet'))
+        self.assertEqual(table.num_rows, 0)
+        self.assertEqual(table.schema.names, export.columns(Person))
+
+    def test_failed_export_removes_temporary_file(self):
+        self.server.populate(people=10)
+        self.server.fail_next(500)
+        self.assertRaises(UnexpectedResponse, export.export_resource, self.directory, 'people', 'csv')
+        self.assertEqual(os.listdir(self.directory), [])
@@ -0,0 +1,91 @@
+import time
+
+from tests import *
+
+
+class PaginationTests(FakeServerTestCase):
+
+    def add_person(self, name, notes=0):
+        id = self.server.add('people', '<person><first-name>%s</first-name></person>' % name)
+        for i in range(notes):
+            self.server.add('notes', '<note><body>Note %d</body><subject-id>%d</subject-id>'
+                            '<subject-type>Party</subject-type></note>' % (i, id))
+        return id
+
+    def test_short_first_page_is_the_last(self):
+        id = self.add_person('Kim', notes=3)
+        person = Person.get(id)
+        self.server.log.clear()
+        self.assertEqual(len(person.notes), 3)
+        self.assertEqual(self.requests('GET'), ['/people/%s/notes.xml' % id])
+
+        self.server.log.clear()
+        self.assertEqual(len(Person.filter(term='kim')), 1)
+        self.assertEqual(self.requests('GET'), ['/people/search.xml?term=kim'])
+
+    def test_full_pages_are_followed(self):
+        id = self.add_person('Lee', notes=30)
+        self.server.populate(people=600)
+        self.server.log.clear()
+        self.assertEqual(len(Person.get(id).notes), 30)
+        self.assertEqual(len(Person.all()), 601)
+        self.assertEqual(self.requests('GET'), ['/people/%s.xml' % id, '/people/%s/notes.xml' % id,
+                                                '/people/%s/notes.xml?n=25' % id, '/people.xml', '/people.xml?n=500'])
+
+
+class ReadAheadTests(FakeServerTestCase):
+
+    def setUp(self):
+        FakeServerTestCase.setUp(self)
+        Highrise.set_read_ahead(3)
+
+    def tearDown(self):
+        Highrise.set_read_ahead(0)
+        Highrise.set_parse_processes(0)
+        FakeServerTestCase.tearDown(self)
+
+    def wait_for_requests(self):
+        """Let the pages still in flight past the end of a list arrive"""
+
+        count = None
+        while count != self.server.request_count:
+            count = self.server.request_count
+            time.sleep(0.2)
+
+    def check_list(self):
+        self.server.populate(people=1600)
+        self.server.log.clear()
+        ids = [person.id for person in Person.iter_all()]
+        self.assertEqual(len(ids), 1600)
+        self.assertEqual(len(set(ids)), 1600)
+
+        # four pages, and no more past the end than were already in flight
+        # when the short one came back
+        self.wait_for_requests()
+        requests = self.requests('GET')
+        self.assertEqual(len(requests), len(set(requests)))
+        self.assertTrue(4 <= len(requests) <= 4 + 3 - 1, requests)
+
+    def test_read_ahead(self):
+        self.check_list()
+
+    def test_read_ahead_with_parse_processes(self):
+        Highrise.set_parse_processes(2)
+        self.check_list()
+
+    def test_single_page_is_not_read_ahead(self):
+        id = self.server.add('people', '<person><first-name>Max</first-name></person>')
+        for i in range(3):
+            self.server.add('notes', '<note><body>Note %d</body><subject-id>%d</subject-id>'
+                            '<subject-type>Party</subject-type></note>' % (i, id))
+        self.server.log.clear()
+        self.assertEqual(len(Person.get(id).notes), 3)
+        self.wait_for_requests()
+        self.assertEqual(self.requests('GET'), ['/people/%s.xml' % id, '/people/%s/notes.xml' % id])
+
+    def test_threads_are_shared(self):
+        self.server.populate(people=1200)
+        list(Person.iter_all())
+        pool = Highrise._read_ahead_pool
+        list(Person.iter_all())
+        self.assertTrue(pool is not None and Highrise._read_ahead_pool is pool)
@@ -0,0 +1,82 @@
+import threading
+import time
+from email.utils import formatdate
+
+from tests import *
+
+
+class RetryTests(FakeServerTestCase):
+
+    def setUp(self):
+        FakeServerTestCase.setUp(self)
+        Highrise.set_retries(3, backoff=0.01, max_backoff=0.02)
+        self.id = self.server.add('people', '<person><first-name>Ned</first-name></person>')
+        self.retries = []
+        Highrise.add_hook('retry', self.retries.append)
+
+    def tearDown(self):
+        Highrise.remove_hook('retry', self.retries.append)
+        Highrise.set_retries(3)
+        Highrise._paused_until = 0
+        FakeServerTestCase.tearDown(self)
+
+    def test_throttled_requests_are_retried(self):
+        self.server.fail_next(503, 2)
+        self.assertEqual(Person.get(self.id).first_name, 'Ned')
+        self.assertEqual([status for method, path, status in self.server.log], [503, 503, 200])
+
+    def test_gateway_errors_back_off(self):
+        self.server.fail_next(502, 3)
+        self.assertEqual(Person.get(self.id).first_name, 'Ned')
+        self.assertEqual([info['attempt'] for info in self.retries], [1, 2, 3])
+        for info in self.retries:
+            self.assertTrue(0 <= info['delay'] <= min(0.02, 0.01 * 2 ** (info['attempt'] - 1)))
+
+    def test_gives_up_after_retries(self):
+        self.server.fail_next(503, 5)
+        self.assertRaises(ServiceUnavailable, Person.get, self.id)
+        self.assertEqual(len(self.requests('GET')), 4)
+
+    def test_retry_after_is_honoured(self):
+        self.server.retry_after = 1
+        self.server.fail_next(503)
+        started = time.time()
+        Person.get(self.id)
+        self.assertTrue(time.time() - started >= 0.9)
+        self.assertEqual(self.retries[0]['delay'], 1)
+
+    def test_retry_after_header(self):
+        self.assertEqual(Highrise._retry_after(None), None)
+        self.assertEqual(Highrise._retry_after('7'), 7)
+        self.assertEqual(Highrise._retry_after('-3'), 0)
+        self.assertEqual(Highrise._retry_after('soon'), None)
+        self.assertTrue(28 <= Highrise._retry_after(formatdate(time.time() + 30, usegmt=True)) <= 30)
+        self.assertEqual(Highrise._retry_after(formatdate(time.time() - 30, usegmt=True)), 0)
+
+    def test_post_not_retried_after_gateway_error(self):
+        self.server.fail_next(502)
+        self.assertRaises(GatewayConnectionError, Person(first_name='Ola').save)
+        self.assertEqual(len(self.requests('POST')), 1)
+        self.assertEqual(self.server.count('people'), 1)
+
+    def test_post_retried_when_throttled(self):
+        self.server.fail_next(503)
+        person = Person(first_name='Pia')
+        person.save()
+        self.assertEqual(len(self.requests('POST')), 2)
+        self.assertEqual(self.server.get('people', person.id).findtext('first-name'), 'Pia')
+
+    def test_pause_is_shared_between_threads(self):
+        self.server.retry_after = 1
+        self.server.fail_next(503)
+        thread = threading.Thread(target=Person.get, args=(self.id,))
+        thread.start()
+        while Highrise._paused_until < time.time():
+            time.sleep(0.01)
+
+        # this thread wasn't throttled itself, but still waits out the pause
+        started = time.time()
+        Person.get(self.id)
+        self.assertTrue(time.time() - started >= 0.8)
+        thread.join()
+        self.assertEqual(len(self.retries), 1)
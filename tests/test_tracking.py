@@ -0,0 +1,46 @@
+from tests import *
+
+
+class EmptyValueTests(FakeServerTestCase):
+
+    def test_empty_array_is_tracked(self):
+        id = self.server.add('people', '<person><first-name>Ann</first-name>'
+                             '<contact-data><email-addresses type="array"/></contact-data></person>')
+        person = Person.get(id)
+        person.contact_data.email_addresses.append(EmailAddress(address='ann@example.com', location='Work'))
+        self.assertEqual(person.changed_fields, set(['contact_data']))
+        person.save()
+        self.assertEqual(self.requests('PUT'), ['/people/%s.xml' % id])
+
+    def test_missing_contact_data_is_tracked(self):
+        id = self.server.add('people', '<person><first-name>Bob</first-name></person>')
+        person = Person.get(id)
+        person.contact_data.email_addresses.append(EmailAddress(address='bob@example.com', location='Work'))
+        self.assertEqual(person.changed_fields, set(['contact_data']))
+        person.save()
+        self.assertEqual(self.requests('PUT'), ['/people/%s.xml' % id])
+        self.assertEqual(self.server.get('people', id).findtext('contact-data/email-addresses/email-address/address'),
+                         'bob@example.com')
+
+    def test_compact_missing_contact_data_is_tracked(self):
+        id = self.server.add('people', '<person><first-name>Cy</first-name></person>')
+        person = Person.compact().get(id)
+        person.contact_data.email_addresses.append(EmailAddress.compact()(address='cy@example.com', location='Work'))
+        self.assertEqual(person.changed_fields, set(['contact_data']))
+
+
+class LazyRefreshTests(FakeServerTestCase):
+
+    def test_nested_edit_after_refresh(self):
+        Highrise.set_lazy_nested(True)
+        id = self.server.add('people', '<person><first-name>Dee</first-name><contact-data><email-addresses type="array">'
+                             '<email-address><address>dee@example.com</address><location>Work</location></email-address>'
+                             '</email-addresses></contact-data></person>')
+        person = Person.get(id)
+        person.first_name = 'Deb'
+        person.save(refresh=True)
+        person.contact_data.email_addresses[0].address = 'deb@example.com'
+        self.assertEqual(person.changed_fields, set(['contact_data']))
+        person.save()
+        self.assertEqual(self.server.get('people', id).findtext('contact-data/email-addresses/email-address/address'),
+                         'deb@example.com')